@@ -5,10 +5,12 @@
 import streamlit as st
 from typing import Dict, Any, List, Optional, Tuple
 import json
+import functools
 import database
 from database import get_db_connection
 import chess
 import pandas as pd
+from chess_board import material_totals
 import plotly.express as px
 import plotly.graph_objects as go
 
@@ -576,26 +578,16 @@ def get_material_analysis(user_id):
 
 def calculate_simple_material_difference(board: chess.Board) -> float:
     """Calculate simple material difference."""
-    piece_values = {
-        chess.PAWN: 1,
-        chess.KNIGHT: 3,
-        chess.BISHOP: 3,
-        chess.ROOK: 5,
-        chess.QUEEN: 9
-    }
-    
-    white_material = 0
-    black_material = 0
-    
-    for square in chess.SQUARES:
-        piece = board.piece_at(square)
-        if piece and piece.piece_type in piece_values:
-            value = piece_values[piece.piece_type]
-            if piece.color == chess.WHITE:
-                white_material += value
-            else:
-                black_material += value
-    
+    return _material_difference_by_key(
+        board.pawns, board.knights, board.bishops, board.rooks, board.queens,
+        board.occupied_co[chess.WHITE], board.occupied_co[chess.BLACK]
+    )
+
+@functools.lru_cache(maxsize=8192)
+def _material_difference_by_key(pawns: int, knights: int, bishops: int, rooks: int, queens: int,
+                                white: int, black: int) -> int:
+    """Material difference for a set of piece bitboards, memoized across repeated positions."""
+    white_material, black_material = material_totals(pawns, knights, bishops, rooks, queens, white, black)
     return white_material - black_material
 
 def get_mobility_analysis(user_id):
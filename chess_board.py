@@ -18,6 +18,35 @@ import chess
 import chess.svg
 from typing import Optional, List, Dict, Any
 
+# SAN piece letters to icons, for move notation
+PIECE_ICON_TABLE = str.maketrans({'K': '♔', 'Q': '♕', 'R': '♖', 'B': '♗', 'N': '♘'})
+PIECE_LETTERS = frozenset('KQRBN')
+
+
+def piece_icons(san: str) -> str:
+    """Replace the piece letters in SAN move notation with chess icons."""
+    # Pawn moves and castling have no piece letters to replace
+    if not san or PIECE_LETTERS.isdisjoint(san):
+        return san
+    
+    return san.translate(PIECE_ICON_TABLE)
+
+
+# Material values indexed by chess piece type (index 0 unused, king 0)
+PIECE_VALUES = (0, 1, 3, 3, 5, 9, 0)
+
+
+def material_totals(pawns: int, knights: int, bishops: int, rooks: int, queens: int,
+                    white: int, black: int) -> Tuple[int, int]:
+    """White and black material for a set of piece bitboards and colour masks."""
+    values = PIECE_VALUES[chess.PAWN:chess.KING]
+    bitboards = (pawns, knights, bishops, rooks, queens)
+    
+    # One popcount per piece type and colour instead of a 64-square scan
+    white_total = sum(chess.popcount(bb & white) * v for bb, v in zip(bitboards, values))
+    black_total = sum(chess.popcount(bb & black) * v for bb, v in zip(bitboards, values))
+    return white_total, black_total
+
 
 def display_chess_board(fen: str, theme: str = 'default', 
                        highlight_best_move: bool = False, 
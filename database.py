@@ -1,6 +1,7 @@
 # database.py - Enhanced Database for Kuikma Chess Engine
 import sqlite3
 import json
+import functools
 import hashlib
 from datetime import datetime
 import os
@@ -311,6 +312,9 @@ def init_db():
         'CREATE INDEX IF NOT EXISTS idx_games_date ON games(date)',
         'CREATE INDEX IF NOT EXISTS idx_games_result ON games(result)',
         'CREATE INDEX IF NOT EXISTS idx_games_opening ON games(opening)',
+        'CREATE INDEX IF NOT EXISTS idx_games_event ON games(event)',
+        'CREATE INDEX IF NOT EXISTS idx_games_elo ON games(white_elo, black_elo)',
+        'CREATE INDEX IF NOT EXISTS idx_games_total_moves ON games(total_moves) WHERE total_moves IS NOT NULL',
         'CREATE INDEX IF NOT EXISTS idx_user_game_analysis_user_id ON user_game_analysis(user_id)',
         'CREATE INDEX IF NOT EXISTS idx_user_game_analysis_status ON user_game_analysis(analysis_status)',
         'CREATE INDEX IF NOT EXISTS idx_user_saved_games ON user_saved_games(user_id)',
@@ -328,9 +332,62 @@ def init_db():
         except sqlite3.Error as e:
             print(f"Index creation warning: {e}")
     
+    create_games_search_index(cursor)
+    
     conn.commit()
     conn.close()
 
+def create_games_search_index(cursor) -> bool:
+    """Create the trigram FTS5 index used for substring search over games.
+    
+    The index mirrors white_player, black_player, event and opening and is
+    kept in sync with triggers. A trigram index answers LIKE '%x%' with the
+    same semantics as on the base table.
+    """
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='games_fts'")
+    if cursor.fetchone():
+        return True
+    
+    cursor.execute("PRAGMA table_info(games)")
+    if 'white_player' not in [col[1] for col in cursor.fetchall()]:
+        return False
+    
+    try:
+        cursor.execute('''
+        CREATE VIRTUAL TABLE games_fts USING fts5(
+            white_player, black_player, event, opening,
+            content='games', content_rowid='id', tokenize='trigram'
+        )
+        ''')
+    except sqlite3.Error as e:
+        print(f"Games search index unavailable: {e}")
+        return False
+    
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS games_fts_insert AFTER INSERT ON games BEGIN
+        INSERT INTO games_fts(rowid, white_player, black_player, event, opening)
+        VALUES (new.id, new.white_player, new.black_player, new.event, new.opening);
+    END
+    ''')
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS games_fts_delete AFTER DELETE ON games BEGIN
+        INSERT INTO games_fts(games_fts, rowid, white_player, black_player, event, opening)
+        VALUES ('delete', old.id, old.white_player, old.black_player, old.event, old.opening);
+    END
+    ''')
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS games_fts_update AFTER UPDATE ON games BEGIN
+        INSERT INTO games_fts(games_fts, rowid, white_player, black_player, event, opening)
+        VALUES ('delete', old.id, old.white_player, old.black_player, old.event, old.opening);
+        INSERT INTO games_fts(rowid, white_player, black_player, event, opening)
+        VALUES (new.id, new.white_player, new.black_player, new.event, new.opening);
+    END
+    ''')
+    
+    # Index games that existed before the search table
+    cursor.execute("INSERT INTO games_fts(games_fts) VALUES('rebuild')")
+    return True
+
 def store_pgn_games(games_data, pgn_source="uploaded"):
     """
     Enhanced PGN games storage with better player name handling.
@@ -686,16 +743,28 @@ def optimize_database():
     finally:
         conn.close()
 
-def get_db_connection():
+def get_db_connection(check_same_thread: bool = True):
     """Get database connection with enhanced configuration."""
     db_path = config.DATABASE_PATH
     os.makedirs(os.path.dirname(db_path), exist_ok=True)
     
-    conn = sqlite3.connect(db_path, timeout=30.0)
+    conn = sqlite3.connect(db_path, timeout=30.0, check_same_thread=check_same_thread)
     conn.row_factory = sqlite3.Row
     conn.execute('PRAGMA foreign_keys = ON')
     conn.execute('PRAGMA journal_mode = WAL')
+    # Read-heavy tuning: memory-map up to 256 MB and keep a 64 MB page cache.
+    conn.execute('PRAGMA mmap_size = 268435456')
+    conn.execute('PRAGMA cache_size = -65536')
+
+    return conn
 
+@functools.lru_cache(maxsize=1)
+def get_shared_connection() -> sqlite3.Connection:
+    """Long-lived read connection shared by the browsing views, keeping SQLite's page cache warm."""
+    conn = get_db_connection(check_same_thread=False)
+    conn.execute('PRAGMA temp_store = MEMORY')
+    # Gather planner statistics for the search filters once per process
+    conn.execute('PRAGMA optimize = 0x10002')
     return conn
 
 
@@ -1185,6 +1254,7 @@ def create_enhanced_tables():
         indexes = [
             'CREATE INDEX IF NOT EXISTS idx_users_email ON users(email)',
             'CREATE INDEX IF NOT EXISTS idx_users_verification_status ON users(verification_status)',
+            'CREATE INDEX IF NOT EXISTS idx_users_filter ON users(created_at DESC)',
             'CREATE INDEX IF NOT EXISTS idx_verification_requests_user_id ON user_verification_requests(user_id)',
             'CREATE INDEX IF NOT EXISTS idx_verification_requests_status ON user_verification_requests(status)',
             'CREATE INDEX IF NOT EXISTS idx_subscriptions_user_id ON user_subscriptions(user_id)',
@@ -1241,6 +1311,11 @@ def upgrade_existing_database():
         # Create new tables
         create_enhanced_tables()
         
+        # Substring search index for the game browser
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='games'")
+        if cursor.fetchone():
+            create_games_search_index(cursor)
+        
         # Auto-verify admin users and existing users if configured
         if config.AUTO_APPROVE_USERS:
             cursor.execute('''
@@ -1501,6 +1576,75 @@ def clean_orphaned_records() -> Dict[str, int]:
 
 # Additional helper functions for the consolidated admin interface
 
+# Specialized users listing queries, keyed by (columns, status, admin, account) filters
+_USERS_QUERY_TABLE: Dict[Tuple, str] = {}
+
+def _users_query(all_columns: Tuple[str, ...], filter_status: bool,
+                 admin_filter: str, filter_account: bool) -> str:
+    """Return the listing SQL for a filter combination, building it once."""
+    key = (all_columns, filter_status, admin_filter, filter_account)
+    query = _USERS_QUERY_TABLE.get(key)
+    if query is None:
+        parts = [f"SELECT {', '.join(all_columns)} FROM users WHERE 1=1"]
+        
+        if filter_status:
+            parts.append(" AND verification_status = ?")
+        
+        if admin_filter == 'Admin':
+            parts.append(" AND is_admin = 1")
+        elif admin_filter == 'Regular Users':
+            parts.append(" AND is_admin = 0")
+        
+        if filter_account:
+            parts.append(" AND account_status = ?")
+        
+        parts.append(" ORDER BY created_at DESC")
+        query = _USERS_QUERY_TABLE[key] = ''.join(parts)
+    return query
+
+def _users_listing_columns(cursor) -> List[str]:
+    """Get the users columns shown in the admin listing, based on what exists."""
+    cursor.execute("PRAGMA table_info(users)")
+    available_columns = [col[1] for col in cursor.fetchall()]
+    
+    # Build base query
+    base_columns = ['id', 'email', 'created_at', 'last_login', 'is_admin']
+    optional_columns = []
+    
+    if 'is_verified' in available_columns:
+        optional_columns.append('is_verified')
+    if 'verification_status' in available_columns:
+        optional_columns.append('verification_status')
+    if 'account_status' in available_columns:
+        optional_columns.append('account_status')
+    if 'full_name' in available_columns:
+        optional_columns.append('full_name')
+    
+    return base_columns + optional_columns
+
+def check_users_query_plan() -> bool:
+    """Verify the unfiltered users listing query is served by idx_users_filter."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    
+    try:
+        all_columns = _users_listing_columns(cursor)
+        query = _users_query(tuple(all_columns), False, 'All', False)
+        cursor.execute("EXPLAIN QUERY PLAN " + query)
+        plan = [row[-1] for row in cursor.fetchall()]
+        
+        if any('idx_users_filter' in step for step in plan):
+            return True
+        
+        print(f"⚠️ Users listing query is not using idx_users_filter: {plan}")
+        return False
+        
+    except Exception as e:
+        print(f"Error checking users query plan: {e}")
+        return False
+    finally:
+        conn.close()
+
 def get_users_with_filters(status_filter: str = 'All', admin_filter: str = 'All', 
                           account_filter: str = 'All') -> List[Dict[str, Any]]:
     """Get users with applied filters."""
@@ -1508,47 +1652,26 @@ def get_users_with_filters(status_filter: str = 'All', admin_filter: str = 'All'
     cursor = conn.cursor()
     
     try:
-        # Check what columns exist
-        cursor.execute("PRAGMA table_info(users)")
-        columns_info = cursor.fetchall()
-        available_columns = [col[1] for col in columns_info]
+        all_columns = _users_listing_columns(cursor)
         
-        # Build base query
-        base_columns = ['id', 'email', 'created_at', 'last_login', 'is_admin']
-        optional_columns = []
+        filter_status = status_filter != 'All' and 'verification_status' in all_columns
+        filter_account = account_filter != 'All' and 'account_status' in all_columns
         
-        if 'is_verified' in available_columns:
-            optional_columns.append('is_verified')
-        if 'verification_status' in available_columns:
-            optional_columns.append('verification_status')
-        if 'account_status' in available_columns:
-            optional_columns.append('account_status')
-        if 'full_name' in available_columns:
-            optional_columns.append('full_name')
-        
-        all_columns = base_columns + optional_columns
-        
-        query = f"SELECT {', '.join(all_columns)} FROM users WHERE 1=1"
+        query = _users_query(tuple(all_columns), filter_status, admin_filter, filter_account)
         params = []
-        
-        # Apply filters
-        if status_filter != 'All' and 'verification_status' in available_columns:
-            query += " AND verification_status = ?"
+        if filter_status:
             params.append(status_filter)
-        
-        if admin_filter == 'Admin':
-            query += " AND is_admin = 1"
-        elif admin_filter == 'Regular Users':
-            query += " AND is_admin = 0"
-        
-        if account_filter != 'All' and 'account_status' in available_columns:
-            query += " AND account_status = ?"
+        if filter_account:
             params.append(account_filter)
         
-        query += " ORDER BY created_at DESC"
-        
-        result = safe_query_execution(cursor, query, params, 'fetchall')
-        
+        # Hot listing path: execute directly rather than via safe_query_execution
+        try:
+            result = cursor.execute(query, params).fetchall()
+        except sqlite3.Error as e:
+            print(f"Query execution error: {e}")
+            print(f"Query: {query}")
+            return []
+
         if result:
             users = []
             for row in result:
@@ -1571,7 +1694,8 @@ def get_users_with_filters(status_filter: str = 'All', admin_filter: str = 'All'
 __all__ = [
     'create_enhanced_tables', 'upgrade_existing_database', 'safe_query_execution',
     'get_feature_access_data', 'update_feature_access_safely', 'get_database_statistics',
-    'get_database_size_mb', 'clean_orphaned_records', 'get_users_with_filters'
+    'get_database_size_mb', 'clean_orphaned_records', 'get_users_with_filters',
+    'check_users_query_plan'
 ]
 
 # Initialize enhanced database on import
@@ -1589,6 +1713,7 @@ if __name__ == "__main__":
     print("Initializing enhanced database...")
     create_enhanced_tables()
     upgrade_existing_database()
+    check_users_query_plan()
     print("Enhanced database initialization complete.")
     print("✅ Enhanced Kuikma Chess Engine database initialized successfully!")
 
@@ -1,22 +1,107 @@
 # game_analysis.py - Game Analysis for Kuikma Chess Engine
 import streamlit as st
-import sqlite3
 import chess
 import chess.pgn
 import chess.svg
-import math
+import functools
 import io
 import json
 import random
+import threading
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, Iterator, List, Optional, TextIO, Tuple
 import database
 import auth
 from game_html_generator import GameHTMLGenerator
-from pathlib import Path
+from chess_board import PIECE_VALUES, piece_icons
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import spatial_analysis
+except ImportError:
+    spatial_analysis = None
+
+# Number of analyzed games whose positions are kept for quick re-analysis
+GAME_CACHE_SIZE = 8
+
+# Number of positions whose spatial metrics are kept across games
+SPATIAL_METRICS_CACHE_SIZE = 4096
+
+# Board SVG styles
+BOARD_SVG_STYLE = """
+            .square.light { fill: #f0d9b5; }
+            .square.dark {  fill: #b58863; }
+            .square.light.lastmove { fill: #cdd26a; }
+            .square.dark.lastmove  { fill: #aaa23a; }
+            .piece { font-size: 45px; }
+            """
+CRITICAL_BOARD_SVG_STYLE = """
+                            .square.light { fill: #f0d9b5; }
+                            .square.dark { fill: #b58863; }
+                            """
+
+# Piece types in the alphabetical order of their material-string letters
+PIECE_LETTER_ORDER = tuple(sorted(chess.PIECE_TYPES, key=lambda piece_type: chess.piece_name(piece_type)[0].upper()))
+
+# Shared layout for charts plotted against move number
+MOVE_CHART_LAYOUT = dict(xaxis_title='Move Number', hovermode='x unified', height=400)
+
+# One square of the space control board
+SPACE_CONTROL_CELL_HTML = '''
+            <td style="
+                width: 40px; 
+                height: 40px; 
+                background-color: {bg_color}; 
+                text-align: center; 
+                vertical-align: middle;
+                border: 1px solid #d1d5db;
+                font-size: 14px;
+            ">{symbol}</td>
+            '''
+
+# Space control cell colours and symbols, indexed by
+# light neutral, dark neutral, white, black, contested
+SPACE_CONTROL_COLORS = np.array(['#f0d9b5', '#b58863', '#3b82f6', '#8b5cf6', '#f59e0b'])
+SPACE_CONTROL_SYMBOLS = np.array(['', '', '🔵', '🟣', '🟠'])
+DISPLAY_SQUARE_SHADE = np.add.outer(np.arange(8), np.arange(8)) % 2
+
+# Card for one game in the database search results
+GAME_CARD_HTML = '''
+            <div style="
+                background: white;
+                padding: 1.5rem;
+                border-radius: 12px;
+                border: 1px solid #e2e8f0;
+                margin-bottom: 1rem;
+                box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+            ">
+                <div style="display: flex; justify-content: space-between; align-items: start;">
+                    <div style="flex: 1;">
+                        <h4 style="margin: 0 0 0.5rem 0; color: #1a202c;">
+                            {white} vs {black}
+                        </h4>
+                        <div style="color: #718096; font-size: 0.9rem; margin-bottom: 0.5rem;">
+                            <strong>Result:</strong> {result} • 
+                            <strong>Moves:</strong> {moves} • 
+                            <strong>Date:</strong> {date}
+                        </div>
+                        <div style="color: #4a5568; font-size: 0.85rem;">
+                            <strong>Event:</strong> {event}<br>
+                            <strong>Opening:</strong> {opening}<br>
+                            <strong>ELOs:</strong> {white_elo} / {black_elo}
+                        </div>
+                    </div>
+                </div>
+            </div>
+            '''
 
 def display_game_analysis():
     """Main entry point for game analysis with simplified UX."""
@@ -81,11 +166,7 @@ def handle_database_browser():
     
     # Quick stats
     try:
-        conn = database.get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) as total FROM games")
-        total_games = cursor.fetchone()['total']
-        conn.close()
+        total_games = _total_games()
         st.info(f"📊 Total games in database: {total_games}")
     except Exception as e:
         st.error(f"❌ Database error: {e}")
@@ -141,89 +222,39 @@ def handle_database_browser():
     
     if search_clicked or quick_search_clicked or load_all_clicked:
         try:
-            conn = database.get_db_connection()
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+            columns = _games_columns()
             
-            # Check column names
-            cursor.execute("PRAGMA table_info(games)")
-            columns = [col['name'] for col in cursor.fetchall()]
-            
-            # Build query based on available columns
-            if 'white_player' in columns:
-                base_sql = """SELECT id, white_player as white, black_player as black, 
-                             white_elo, black_elo, result, date, event, opening, 
-                             COALESCE(total_moves, 0) as moves FROM games"""
-            else:
-                base_sql = """SELECT id, white, black, white_elo, black_elo, result, date, 
-                             event, opening, COALESCE(moves, 0) as moves FROM games"""
-            
-            where_clauses = []
-            params = []
-            
-            # Apply filters based on search type
-            if search_clicked or quick_search_clicked:
-                # Player filter
-                if player_name:
-                    if 'white_player' in columns:
-                        where_clauses.append("(white_player LIKE ? OR black_player LIKE ?)")
-                    else:
-                        where_clauses.append("(white LIKE ? OR black LIKE ?)")
-                    params.extend([f"%{player_name}%", f"%{player_name}%"])
-                
-                # Result filter
-                if result_filter != "All":
-                    where_clauses.append("result = ?")
-                    params.append(result_filter)
-                
-                # Advanced filters (only for full search)
-                if search_clicked:
-                    if event_filter:
-                        where_clauses.append("event LIKE ?")
-                        params.append(f"%{event_filter}%")
-                    
-                    if opening_filter:
-                        where_clauses.append("opening LIKE ?")
-                        params.append(f"%{opening_filter}%")
-                    
-                    if min_elo > 0:
-                        where_clauses.append("(COALESCE(white_elo, 0) >= ? OR COALESCE(black_elo, 0) >= ?)")
-                        params.extend([min_elo, min_elo])
-                    
-                    if max_elo < 3000:
-                        where_clauses.append("(COALESCE(white_elo, 9999) <= ? OR COALESCE(black_elo, 9999) <= ?)")
-                        params.extend([max_elo, max_elo])
-                    
-                    if date_from:
-                        where_clauses.append("date >= ?")
-                        params.append(date_from.strftime('%Y.%m.%d'))
-                    
-                    if date_to:
-                        where_clauses.append("date <= ?")
-                        params.append(date_to.strftime('%Y.%m.%d'))
-                    
-                    if min_moves > 0:
-                        moves_col = 'total_moves' if 'total_moves' in columns else 'moves'
-                        where_clauses.append(f"COALESCE({moves_col}, 0) >= ?")
-                        params.append(min_moves)
+            advanced = search_clicked
+            filtered = search_clicked or quick_search_clicked
+            params = {
+                'player': f"%{player_name}%" if filtered and player_name else None,
+                'result': result_filter if filtered and result_filter != "All" else None,
+                'event': f"%{event_filter}%" if advanced and event_filter else None,
+                'opening': f"%{opening_filter}%" if advanced and opening_filter else None,
+                'min_elo': min_elo if advanced and min_elo > 0 else None,
+                'max_elo': max_elo if advanced and max_elo < 3000 else None,
+                'date_from': date_from.strftime('%Y.%m.%d') if advanced and date_from else None,
+                'date_to': date_to.strftime('%Y.%m.%d') if advanced and date_to else None,
+                'min_moves': min_moves if advanced and min_moves > 0 else None
+            }
             
-            # Build final query
-            sql = base_sql
-            if where_clauses:
-                sql += " WHERE " + " AND ".join(where_clauses)
+            # Only active filters reach the WHERE clause, so their indexes can be used
+            sql, where_sql = _game_search_sql('white_player' in columns, _has_games_fts(),
+                                              'total_moves' if 'total_moves' in columns else 'moves',
+                                              tuple(name for name, value in params.items() if value is not None))
             
-            # Limit results
+            # Limit results; rows are fetched a page at a time by the grid
             limit = 100 if search_clicked else 50 if quick_search_clicked else 25
-            sql += f" ORDER BY id DESC LIMIT {limit}"
-            
-            cursor.execute(sql, params)
-            games = [dict(row) for row in cursor.fetchall()]
-            conn.close()
+            total = count_database_games(where_sql, params, limit)
             
-            st.session_state['search_results'] = games
+            st.session_state['search_results'] = {
+                'sql': sql,
+                'params': params,
+                'total': total
+            }
             
-            if games:
-                st.success(f"✅ Found {len(games)} games")
+            if total:
+                st.success(f"✅ Found {total} games")
             else:
                 st.warning("🔍 No games found matching your criteria")
             
@@ -232,8 +263,7 @@ def handle_database_browser():
     
     # Display enhanced results
     if 'search_results' in st.session_state:
-        games = st.session_state['search_results']
-        display_enhanced_games_grid(games)
+        display_enhanced_games_grid(st.session_state['search_results'])
 
 
 def handle_pgn_paste():
@@ -256,9 +286,9 @@ def handle_pgn_paste():
     if pgn_content.strip():
         if st.button("🎯 Analyze Game", type="primary", use_container_width=True):
             try:
-                games = parse_pgn_content(pgn_content)
-                if games:
-                    start_analysis(games[0])
+                game = load_first_game(pgn_content)
+                if game:
+                    start_analysis(game)
                     st.success("✅ Game loaded!")
                     st.rerun()
                 else:
@@ -275,26 +305,35 @@ def handle_pgn_upload():
     
     if uploaded_file is not None:
         try:
-            content = uploaded_file.read().decode('utf-8')
-            games = parse_pgn_content(content)
+            # Index headers only, once per upload; a game's moves are parsed once it is picked
+            pgn_index = st.session_state.get('ga_pgn_index')
+            if pgn_index is None or pgn_index[0] != uploaded_file.file_id:
+                pgn_index = (uploaded_file.file_id, parse_pgn_headers(open_uploaded_pgn(uploaded_file)))
+                st.session_state['ga_pgn_index'] = pgn_index
+            game_index = pgn_index[1]
             
-            if games:
-                if len(games) == 1:
-                    if st.button("🎯 Analyze Game", type="primary", use_container_width=True):
-                        start_analysis(games[0])
-                        st.success("✅ Game loaded!")
-                        st.rerun()
+            if game_index:
+                if len(game_index) == 1:
+                    selected_game = 0
+                    analyze_clicked = st.button("🎯 Analyze Game", type="primary", use_container_width=True)
                 else:
                     selected_game = st.selectbox(
                         "Select game to analyze:",
-                        range(len(games)),
-                        format_func=lambda i: f"Game {i+1}: {games[i].headers.get('White', 'Unknown')} vs {games[i].headers.get('Black', 'Unknown')}"
+                        range(len(game_index)),
+                        format_func=lambda i: f"Game {i+1}: {game_index[i][1].get('White', 'Unknown')} vs {game_index[i][1].get('Black', 'Unknown')}"
                     )
-                    
-                    if st.button("🎯 Analyze Selected Game", type="primary", use_container_width=True):
-                        start_analysis(games[selected_game])
+                    analyze_clicked = st.button("🎯 Analyze Selected Game", type="primary", use_container_width=True)
+                
+                if analyze_clicked:
+                    pgn_io = open_uploaded_pgn(uploaded_file)
+                    pgn_io.seek(game_index[selected_game][0])
+                    game = chess.pgn.read_game(pgn_io)
+                    if game:
+                        start_analysis(game)
                         st.success("✅ Game loaded!")
                         st.rerun()
+                    else:
+                        st.error("❌ Could not parse the selected game")
             else:
                 st.error("❌ No valid games found in file")
         except Exception as e:
@@ -307,11 +346,15 @@ def handle_random_game():
     
     if st.button("🎲 Load Random Game", type="primary", use_container_width=True):
         try:
-            conn = database.get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute("SELECT id FROM games ORDER BY RANDOM() LIMIT 1")
-            result = cursor.fetchone()
-            conn.close()
+            cursor = database.get_shared_connection().cursor()
+            # Seek to a random id instead of sorting the whole table
+            cursor.execute("SELECT MIN(id) AS lo, MAX(id) AS hi FROM games")
+            bounds = cursor.fetchone()
+            result = None
+            if bounds['lo'] is not None:
+                cursor.execute("SELECT id FROM games WHERE id >= ? ORDER BY id LIMIT 1",
+                               (random.randint(bounds['lo'], bounds['hi']),))
+                result = cursor.fetchone()
             
             if result:
                 load_game_from_database(result['id'])
@@ -324,44 +367,22 @@ def handle_random_game():
 def load_game_from_database(game_id: int):
     """Load game from database and start analysis."""
     try:
-        conn = database.get_db_connection()
-        cursor = conn.cursor()
-        
-        # Try to get PGN text first
-        cursor.execute("PRAGMA table_info(games)")
-        columns = [col['name'] for col in cursor.fetchall()]
-        
-        if 'pgn_text' in columns:
-            cursor.execute("SELECT pgn_text FROM games WHERE id = ?", (game_id,))
-            result = cursor.fetchone()
-            if result and result['pgn_text']:
-                games = parse_pgn_content(result['pgn_text'])
-                if games:
-                    start_analysis(games[0])
-                    conn.close()
-                    st.rerun()
-                    return
+        result = _fetch_game_row(game_id)
         
-        # Fallback to structured data
-        if 'white_player' in columns:
-            query = """
-                SELECT white_player, black_player, result, date, event, 
-                       moves_data, positions_data 
-                FROM games WHERE id = ?
-            """
-        else:
-            query = """
-                SELECT white, black, result, date, event, 
-                       moves_data, positions_data 
-                FROM games WHERE id = ?
-            """
-        
-        cursor.execute(query, (game_id,))
-        result = cursor.fetchone()
-        conn.close()
+        # Try PGN text first
+        if result and result['pgn_text']:
+            game = load_first_game(result['pgn_text'])
+            if game:
+                start_analysis(game)
+                st.rerun()
+                return
         
+        # Fallback to structured data
         if result:
-            white, black, result_str, date, event, moves_data, positions_data = result
+            white, black, result_str, date, event, moves_data = (
+                result['white'], result['black'], result['result'],
+                result['date'], result['event'], result['moves_data']
+            )
             
             # Create a simple game object
             game = chess.pgn.Game()
@@ -426,18 +447,26 @@ def start_analysis(game: chess.pgn.Game):
     st.session_state['ga_current_game'] = game
     st.session_state['ga_position_index'] = 0
     
-    # Calculate positions with enhanced analysis
+    # Calculate positions with enhanced analysis, reusing them if this game was analyzed before
     with st.spinner("🔄 Calculating positions and analysis..."):
-        positions = calculate_enhanced_positions(game)
+        game_cache = st.session_state.setdefault('game_cache', {})
+        moves_uci = [move.uci() for move in game.mainline_moves()]
+        cache_key = (game.board().fen(), ' '.join(moves_uci))
+        positions = game_cache.pop(cache_key, None)
+        if positions is None:
+            positions = calculate_enhanced_positions(game)
+        game_cache[cache_key] = positions
+        while len(game_cache) > GAME_CACHE_SIZE:
+            del game_cache[next(iter(game_cache))]
         st.session_state['ga_positions'] = positions
+        st.session_state['ga_eval_arrays'] = build_evaluation_arrays(positions)
+        st.session_state['ga_moves_uci'] = moves_uci
         
-        # Pre-calculate critical positions
-        critical_positions = identify_critical_positions(positions)
-        st.session_state['ga_critical_positions'] = critical_positions
-        
-        # Calculate game statistics
-        game_stats = calculate_comprehensive_game_statistics(positions)
-        st.session_state['ga_game_stats'] = game_stats
+        # Critical positions and game statistics are computed when first needed
+        st.session_state.pop('ga_critical_positions', None)
+        st.session_state.pop('ga_game_stats', None)
+        st.session_state.pop('ga_spatial_data', None)
+        st.session_state.pop('ga_critical_boards_opened', None)
 
 
 def display_game_analysis_interface():
@@ -560,8 +589,6 @@ def display_enhanced_board(position: Dict):
     flipping – the user controls orientation via the toggle.
     """
     try:
-        board: chess.Board = position["board"]
-
         # ───────────────────────────────────────────────────────────
         # 1️⃣  Persist the user’s orientation choice in session state
         #     (initially False → White at bottom)
@@ -586,26 +613,14 @@ def display_enhanced_board(position: Dict):
         # ───────────────────────────────────────────────────────────
         # 2️⃣  Render board SVG with the chosen orientation
         # ───────────────────────────────────────────────────────────
-        board_svg = chess.svg.board(
-            board=board,
-            flipped=flipped,
-            size=450,
-            style="""
-            .square.light { fill: #f0d9b5; }
-            .square.dark {  fill: #b58863; }
-            .square.light.lastmove { fill: #cdd26a; }
-            .square.dark.lastmove  { fill: #aaa23a; }
-            .piece { font-size: 45px; }
-            """
-        )
+        board_svg = _cached_board_svg(position["fen"], flipped, 450, BOARD_SVG_STYLE)
         st.markdown(board_svg, unsafe_allow_html=True)
 
         # ───────────────────────────────────────────────────────────
         # 3️⃣  Show move notation using piece-icons (unchanged)
         # ───────────────────────────────────────────────────────────
-        move_text = position.get("move", "Start")
-        if move_text != "Start":
-            move_with_icons = convert_to_piece_icons(move_text)
+        move_with_icons = position.get("move_icons")
+        if move_with_icons:
             st.markdown(f"### {move_with_icons}")
         else:
             st.markdown("### Starting Position")
@@ -618,12 +633,12 @@ def display_comprehensive_position_analysis(position: Dict, index: int, total: i
     """Display comprehensive analysis of the current position."""
     st.markdown(f"##### Move {position.get('move_number', index)}")
     
-    board = position['board']
+    board = chess.Board(position['fen'])
     
     # Basic position info
     st.markdown(f"**Turn:** {position.get('turn', 'white').title()}")
     st.markdown(f"**Position:** {index + 1} of {total}")
-    st.markdown(f"**Legal Moves:** {len(list(board.legal_moves))}")
+    st.markdown(f"**Legal Moves:** {position['white_moves'] if board.turn == chess.WHITE else position['black_moves']}")
     
     # Game status indicators
     if board.is_check():
@@ -634,10 +649,10 @@ def display_comprehensive_position_analysis(position: Dict, index: int, total: i
         st.info("🤝 Stalemate!")
     
     # Material analysis
-    material = calculate_enhanced_material(board)
+    material = position['material']
     st.markdown("**Material Balance:**")
-    st.markdown(f"• White: {material['white_total']} ({material['white_pieces']})")
-    st.markdown(f"• Black: {material['black_total']} ({material['black_pieces']})")
+    st.markdown(f"• White: {material['white_total']} ({_piece_letters(board, chess.WHITE)})")
+    st.markdown(f"• Black: {material['black_total']} ({_piece_letters(board, chess.BLACK)})")
     st.markdown(f"• Balance: {material['difference']:+.1f}")
     
     # Spatial metrics if available
@@ -695,29 +710,9 @@ def display_position_evaluation_summary(position: Dict):
     """Display position evaluation summary."""
     st.markdown("**Position Assessment:**")
     
-    board = position['board']
-    
-    # Mobility analysis
-    white_moves = len([m for m in board.legal_moves if board.turn == chess.WHITE])
-    black_moves = len([m for m in board.legal_moves if board.turn == chess.BLACK])
-    
-    # Switch turn to count opponent moves
-    board.turn = not board.turn
-    if board.turn == chess.WHITE:
-        white_moves = len(list(board.legal_moves))
-    else:
-        black_moves = len(list(board.legal_moves))
-    board.turn = not board.turn  # Switch back
-    
-    st.markdown(f"• Mobility: W{white_moves} - B{black_moves}")
-    
-    # Development assessment
-    development_score = assess_development(board)
-    st.markdown(f"• Development: {development_score}")
-    
-    # Overall assessment
-    assessment = generate_position_assessment(position)
-    st.info(f"**Overall:** {assessment}")
+    st.markdown(f"• Mobility: W{position['white_moves']} - B{position['black_moves']}")
+    st.markdown(f"• Development: {position['development']}")
+    st.info(f"**Overall:** {position['assessment']}")
 
 
 def display_evaluation_and_metrics():
@@ -730,122 +725,121 @@ def display_evaluation_and_metrics():
         return
     
     # Generate evaluation charts
-    display_evaluation_charts(positions)
+    display_evaluation_charts(st.session_state['ga_eval_arrays'])
     
     # Display statistical summary
-    display_statistical_summary(positions)
+    display_statistical_summary(st.session_state['ga_eval_arrays'])
+
+
+def build_evaluation_arrays(positions: List[Dict]) -> Dict[str, np.ndarray]:
+    """Pack the per-position series into columnar arrays once per analysis."""
+    count = len(positions)
+    metrics = [p.get('spatial_metrics', {}) for p in positions]
+    space_control = [m.get('space_control', {}) for m in metrics]
+    king_safety = [m.get('king_safety', {}) for m in metrics]
+    
+    return {
+        'moves': np.fromiter((p['move_number'] for p in positions), dtype=np.int32, count=count),
+        'material': np.fromiter((p['material_diff'] for p in positions), dtype=np.float32, count=count),
+        'space': np.fromiter((p['space_adv'] for p in positions), dtype=np.int16, count=count),
+        'white_space': np.fromiter((sc.get('white_space_percentage', 0) for sc in space_control), dtype=np.float64, count=count),
+        'black_space': np.fromiter((sc.get('black_space_percentage', 0) for sc in space_control), dtype=np.float64, count=count),
+        'center': np.fromiter((m.get('center_control', {}).get('center_advantage', 0) for m in metrics), dtype=np.int16, count=count),
+        'white_king_threats': np.fromiter((ks.get('white', {}).get('threats', 0) for ks in king_safety), dtype=np.int16, count=count),
+        'black_king_threats': np.fromiter((ks.get('black', {}).get('threats', 0) for ks in king_safety), dtype=np.int16, count=count)
+    }
 
 
-def display_evaluation_charts(positions: List[Dict]):
+def display_evaluation_charts(arrays: Dict[str, np.ndarray]):
     """Generate and display evaluation charts."""
-    if len(positions) < 2:
+    if len(arrays['moves']) < 2:
         return
     
-    # Prepare data for charts
-    moves = [p['move_number'] for p in positions]
-    material_balance = []
-    space_advantage = []
-    
-    for position in positions:
-        # Material balance
-        try:
-            material_data = calculate_enhanced_material(position['board'])
-            material_balance.append(material_data['difference'])
-        except:
-            material_balance.append(0)
-        
-        # Space advantage
-        spatial_metrics = position.get('spatial_metrics', {})
-        space_control = spatial_metrics.get('space_control', {})
-        space_advantage.append(space_control.get('space_advantage', 0))
+    fig_material, fig_space = _evaluation_figures(arrays['moves'], arrays['material'], arrays['space'])
     
     # Create evaluation charts
     chart_col1, chart_col2 = st.columns(2)
     
     with chart_col1:
-        # Material balance chart
-        fig_material = go.Figure()
-        fig_material.add_trace(go.Scatter(
-            x=moves, y=material_balance,
-            mode='lines+markers',
-            name='Material Balance',
-            line=dict(color='#1f77b4', width=3),
-            hovertemplate='Move %{x}<br>Material: %{y:.1f}<extra></extra>'
-        ))
-        fig_material.add_hline(y=0, line_dash="dash", line_color="gray", opacity=0.5)
-        fig_material.update_layout(
-            title='Material Balance Throughout Game',
-            xaxis_title='Move Number',
-            yaxis_title='Material Advantage',
-            hovermode='x unified',
-            height=400
-        )
         st.plotly_chart(fig_material, use_container_width=True)
     
     with chart_col2:
-        # Space advantage chart
-        fig_space = go.Figure()
-        fig_space.add_trace(go.Scatter(
-            x=moves, y=space_advantage,
-            mode='lines+markers',
-            name='Space Advantage',
-            line=dict(color='#ff7f0e', width=3),
-            hovertemplate='Move %{x}<br>Space: %{y:.0f}<extra></extra>'
-        ))
-        fig_space.add_hline(y=0, line_dash="dash", line_color="gray", opacity=0.5)
-        fig_space.update_layout(
-            title='Space Control Throughout Game',
-            xaxis_title='Move Number',
-            yaxis_title='Space Advantage',
-            hovermode='x unified',
-            height=400
-        )
         st.plotly_chart(fig_space, use_container_width=True)
 
 
-def display_statistical_summary(positions: List[Dict]):
+@st.cache_resource(max_entries=32, show_spinner=False)
+def _evaluation_figures(moves: np.ndarray, material_balance: np.ndarray,
+                        space_advantage: np.ndarray) -> Tuple[go.Figure, go.Figure]:
+    """Build the material and space evaluation figures once per game."""
+    # Material balance chart
+    fig_material = go.Figure()
+    fig_material.add_trace(go.Scattergl(
+        x=moves, y=material_balance,
+        mode='lines+markers',
+        name='Material Balance',
+        line=dict(color='#1f77b4', width=3),
+        hovertemplate='Move %{x}<br>Material: %{y:.1f}<extra></extra>'
+    ))
+    fig_material.add_hline(y=0, line_dash="dash", line_color="gray", opacity=0.5)
+    fig_material.update_layout(
+        title='Material Balance Throughout Game',
+        yaxis_title='Material Advantage',
+        **MOVE_CHART_LAYOUT
+    )
+    
+    # Space advantage chart
+    fig_space = go.Figure()
+    fig_space.add_trace(go.Scattergl(
+        x=moves, y=space_advantage,
+        mode='lines+markers',
+        name='Space Advantage',
+        line=dict(color='#ff7f0e', width=3),
+        hovertemplate='Move %{x}<br>Space: %{y:.0f}<extra></extra>'
+    ))
+    fig_space.add_hline(y=0, line_dash="dash", line_color="gray", opacity=0.5)
+    fig_space.update_layout(
+        title='Space Control Throughout Game',
+        yaxis_title='Space Advantage',
+        **MOVE_CHART_LAYOUT
+    )
+    
+    return fig_material, fig_space
+
+
+def display_statistical_summary(arrays: Dict[str, np.ndarray]):
     """Display comprehensive statistical summary."""
     st.markdown("#### 📈 Statistical Summary")
     
-    if not positions:
+    if not len(arrays['moves']):
         return
     
     # Calculate statistics
-    material_values = []
-    space_values = []
+    material_values = np.abs(arrays['material'])
+    space_values = np.abs(arrays['space'])
     
-    for position in positions:
-        try:
-            material_data = calculate_enhanced_material(position['board'])
-            material_values.append(abs(material_data['difference']))
-        except:
-            material_values.append(0)
-        
-        spatial_metrics = position.get('spatial_metrics', {})
-        space_control = spatial_metrics.get('space_control', {})
-        space_values.append(abs(space_control.get('space_advantage', 0)))
+    stat_col1, stat_col2, stat_col3, stat_col4 = st.columns(4)
     
-    if material_values and space_values:
-        stat_col1, stat_col2, stat_col3, stat_col4 = st.columns(4)
-        
-        with stat_col1:
-            st.metric("Avg Material Imbalance", f"{sum(material_values)/len(material_values):.2f}")
-        
-        with stat_col2:
-            st.metric("Max Material Difference", f"{max(material_values):.2f}")
-        
-        with stat_col3:
-            st.metric("Avg Space Imbalance", f"{sum(space_values)/len(space_values):.1f}")
-        
-        with stat_col4:
-            st.metric("Max Space Difference", f"{max(space_values):.1f}")
+    with stat_col1:
+        st.metric("Avg Material Imbalance", f"{material_values.mean():.2f}")
+    
+    with stat_col2:
+        st.metric("Max Material Difference", f"{material_values.max():.2f}")
+    
+    with stat_col3:
+        st.metric("Avg Space Imbalance", f"{space_values.mean():.1f}")
+    
+    with stat_col4:
+        st.metric("Max Space Difference", f"{space_values.max():.1f}")
 
 
+@st.fragment
 def display_critical_positions_analysis():
     """Display comprehensive critical positions analysis."""
     st.markdown("#### 🔍 Critical Positions Analysis")
     
-    critical_positions = st.session_state.get('ga_critical_positions', [])
+    critical_positions = get_critical_positions()
+    positions = st.session_state.get('ga_positions', [])
+    opened_boards = st.session_state.setdefault('ga_critical_boards_opened', set())
     
     if not critical_positions:
         st.info("📊 No critical positions identified in this game.")
@@ -865,7 +859,7 @@ def display_critical_positions_analysis():
                 margin: 1rem 0;
             ">
                 <h4 style="color: #e53e3e; margin: 0 0 1rem 0;">
-                    🎯 Move {pos['move_number']}: {convert_to_piece_icons(pos['move'])}
+                    🎯 Move {pos['move_number']}: {positions[pos['index']]['move_icons']}
                 </h4>
                 <p style="color: #744210; margin: 0;"><strong>Significance:</strong> {pos['reason']}</p>
             </div>
@@ -876,18 +870,16 @@ def display_critical_positions_analysis():
                 detail_col1, detail_col2 = st.columns([1, 1])
                 
                 with detail_col1:
-                    try:
-                        board_svg = chess.svg.board(
-                            board=pos['board'], 
-                            size=350,
-                            style="""
-                            .square.light { fill: #f0d9b5; }
-                            .square.dark { fill: #b58863; }
-                            """
-                        )
-                        st.markdown(board_svg, unsafe_allow_html=True)
-                    except Exception as e:
-                        st.error(f"Error displaying position: {e}")
+                    # Boards are only sent once asked for, since expanders render their content while collapsed
+                    if pos['index'] not in opened_boards and st.button("♟️ Show Board", key=f"show_critical_{i}"):
+                        opened_boards.add(pos['index'])
+                    
+                    if pos['index'] in opened_boards:
+                        try:
+                            board_svg = _cached_board_svg(pos['fen'], False, 350, CRITICAL_BOARD_SVG_STYLE)
+                            st.markdown(board_svg, unsafe_allow_html=True)
+                        except Exception as e:
+                            st.error(f"Error displaying position: {e}")
                 
                 with detail_col2:
                     st.markdown("**Position Details:**")
@@ -903,13 +895,12 @@ def display_critical_positions_analysis():
                     
                     # Additional analysis
                     st.markdown("**Analysis:**")
-                    board = pos['board']
-                    if board.is_check():
+                    if pos['is_check']:
                         st.warning("⚠️ Position involves check")
-                    if board.is_checkmate():
+                    if pos['is_checkmate']:
                         st.error("🏁 Position is checkmate")
                     
-                    material_analysis = calculate_enhanced_material(board)
+                    material_analysis = positions[pos['index']]['material']
                     st.markdown(f"• Material: W{material_analysis['white_total']} - B{material_analysis['black_total']}")
 
 
@@ -924,10 +915,11 @@ def display_spatial_analysis_tab():
     
     try:
         # Check if spatial analysis is available
-        import spatial_analysis
+        if spatial_analysis is None:
+            raise ImportError("spatial_analysis")
         
         # Generate spatial evolution data
-        spatial_data = extract_spatial_evolution_data(positions)
+        spatial_data = get_spatial_evolution_data()
         
         if not spatial_data.empty:
             display_spatial_evolution_charts(spatial_data)
@@ -954,30 +946,29 @@ def display_spatial_analysis_tab():
         st.error(f"Error in spatial analysis: {e}")
 
 
-def extract_spatial_evolution_data(positions: List[Dict]) -> pd.DataFrame:
+def get_spatial_evolution_data() -> pd.DataFrame:
+    """Spatial evolution data of the analyzed game, extracted on first use."""
+    if 'ga_spatial_data' not in st.session_state:
+        st.session_state['ga_spatial_data'] = extract_spatial_evolution_data(st.session_state['ga_eval_arrays'])
+    return st.session_state['ga_spatial_data']
+
+
+def extract_spatial_evolution_data(arrays: Dict[str, np.ndarray]) -> pd.DataFrame:
     """Extract spatial evolution data for analysis."""
-    spatial_data = []
-    
-    for pos in positions:
-        if pos['move_number'] % 3 == 0:  # Every 3rd move for performance
-            metrics = pos.get('spatial_metrics', {})
-            space_control = metrics.get('space_control', {})
-            center_control = metrics.get('center_control', {})
-            material = calculate_enhanced_material(pos['board'])
-            king_safety = metrics.get('king_safety', {})
-            
-            spatial_data.append({
-                'Move': pos['move_number'],
-                'Space_Advantage': space_control.get('space_advantage', 0),
-                'Material_Balance': material['difference'],
-                'White_Space': space_control.get('white_space_percentage', 0),
-                'Black_Space': space_control.get('black_space_percentage', 0),
-                'Center_Control': center_control.get('center_advantage', 0),
-                'White_King_Threats': king_safety.get('white', {}).get('threats', 0),
-                'Black_King_Threats': king_safety.get('black', {}).get('threats', 0)
-            })
-    
-    return pd.DataFrame(spatial_data)
+    sampled = arrays['moves'] % 3 == 0  # Every 3rd move for performance
+    if not sampled.any():
+        return pd.DataFrame()
+    
+    return pd.DataFrame({
+        'Move': arrays['moves'][sampled],
+        'Space_Advantage': arrays['space'][sampled],
+        'Material_Balance': arrays['material'][sampled],
+        'White_Space': arrays['white_space'][sampled],
+        'Black_Space': arrays['black_space'][sampled],
+        'Center_Control': arrays['center'][sampled],
+        'White_King_Threats': arrays['white_king_threats'][sampled],
+        'Black_King_Threats': arrays['black_king_threats'][sampled]
+    })
 
 
 def display_spatial_evolution_charts(df: pd.DataFrame):
@@ -987,6 +978,14 @@ def display_spatial_evolution_charts(df: pd.DataFrame):
     
     st.markdown("##### 📈 Spatial Metrics Evolution")
     
+    fig1, fig2 = _spatial_evolution_figures(df)
+    st.plotly_chart(fig1, use_container_width=True)
+    st.plotly_chart(fig2, use_container_width=True)
+
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def _spatial_evolution_figures(df: pd.DataFrame) -> Tuple[go.Figure, go.Figure]:
+    """Build the spatial evolution figures once per distinct data frame."""
     # Space control evolution
     fig1 = go.Figure()
     fig1.add_trace(go.Scatter(
@@ -1003,12 +1002,9 @@ def display_spatial_evolution_charts(df: pd.DataFrame):
     ))
     fig1.update_layout(
         title='Space Control Evolution',
-        xaxis_title='Move Number',
         yaxis_title='Space Control %',
-        hovermode='x unified',
-        height=400
+        **MOVE_CHART_LAYOUT
     )
-    st.plotly_chart(fig1, use_container_width=True)
     
     # Combined metrics chart
     fig2 = go.Figure()
@@ -1033,12 +1029,11 @@ def display_spatial_evolution_charts(df: pd.DataFrame):
     fig2.add_hline(y=0, line_dash="dash", line_color="gray", opacity=0.5)
     fig2.update_layout(
         title='Combined Positional Metrics',
-        xaxis_title='Move Number',
         yaxis_title='Advantage',
-        hovermode='x unified',
-        height=400
+        **MOVE_CHART_LAYOUT
     )
-    st.plotly_chart(fig2, use_container_width=True)
+    
+    return fig1, fig2
 
 
 def display_space_control_visualization(positions: List[Dict]):
@@ -1069,54 +1064,43 @@ def generate_space_control_board_html(metrics: Dict[str, Any]) -> str:
     if not control_matrix or len(control_matrix) != 8:
         return '<p style="text-align: center; color: #718096;">Space control data not available</p>'
     
-    # Create HTML table representation
-    board_html = '<div style="display: flex; justify-content: center; margin: 1rem 0;"><table style="border-collapse: collapse; border: 2px solid #e2e8f0;">'
-    
-    for rank in range(8):
-        board_html += '<tr>'
-        for file in range(8):
-            control_value = control_matrix[7-rank][file]  # Flip rank for display
-            
-            # Determine background color and symbol
-            if control_value == 1:  # White control
-                bg_color = '#3b82f6'
-                symbol = '🔵'
-            elif control_value == -1:  # Black control
-                bg_color = '#8b5cf6'
-                symbol = '🟣'
-            elif control_value == 2:  # Contested
-                bg_color = '#f59e0b'
-                symbol = '🟠'
-            else:  # Neutral
-                is_light = (rank + file) % 2 == 0
-                bg_color = '#f0d9b5' if is_light else '#b58863'
-                symbol = ''
-            
-            board_html += f'''
-            <td style="
-                width: 40px; 
-                height: 40px; 
-                background-color: {bg_color}; 
-                text-align: center; 
-                vertical-align: middle;
-                border: 1px solid #d1d5db;
-                font-size: 14px;
-            ">{symbol}</td>
-            '''
-        
-        board_html += '</tr>'
+    return _space_control_board_html(
+        tuple(map(tuple, control_matrix)),
+        space_control.get('white_space_percentage', 0),
+        space_control.get('black_space_percentage', 0),
+        space_control.get('contested_percentage', 0),
+        space_control.get('space_advantage', 0)
+    )
+
+
+@functools.lru_cache(maxsize=256)
+def _space_control_board_html(control_matrix: Tuple[Tuple[int, ...], ...], white_pct: float, black_pct: float,
+                              contested_pct: float, advantage: float) -> str:
+    """Render the space control board HTML, memoized on the control matrix and percentages."""
+    # Look up every cell's colour and symbol at once, ranks flipped for display
+    control = np.asarray(control_matrix)[::-1]
+    cell_index = np.select([control == 1, control == -1, control == 2], [2, 3, 4], default=DISPLAY_SQUARE_SHADE)
+    colors = SPACE_CONTROL_COLORS[cell_index]
+    symbols = SPACE_CONTROL_SYMBOLS[cell_index]
     
-    board_html += '</table></div>'
+    # Create HTML table representation
+    rows = (
+        '<tr>' + ''.join(SPACE_CONTROL_CELL_HTML.format(bg_color=color, symbol=symbol)
+                         for color, symbol in zip(color_row, symbol_row)) + '</tr>'
+        for color_row, symbol_row in zip(colors, symbols)
+    )
+    board_html = ('<div style="display: flex; justify-content: center; margin: 1rem 0;"><table style="border-collapse: collapse; border: 2px solid #e2e8f0;">'
+                  + ''.join(rows) + '</table></div>')
     
     # Add legend and statistics
     legend_html = f"""
     <div style="text-align: center; margin: 1rem 0;">
         <p><strong>Legend:</strong> 🔵 White Control • 🟣 Black Control • 🟠 Contested • ⚪ Neutral</p>
         <div style="display: grid; grid-template-columns: repeat(4, 1fr); gap: 1rem; max-width: 400px; margin: 1rem auto;">
-            <div><strong>White:</strong> {space_control.get('white_space_percentage', 0):.1f}%</div>
-            <div><strong>Black:</strong> {space_control.get('black_space_percentage', 0):.1f}%</div>
-            <div><strong>Contested:</strong> {space_control.get('contested_percentage', 0):.1f}%</div>
-            <div><strong>Advantage:</strong> {space_control.get('space_advantage', 0):+.0f}</div>
+            <div><strong>White:</strong> {white_pct:.1f}%</div>
+            <div><strong>Black:</strong> {black_pct:.1f}%</div>
+            <div><strong>Contested:</strong> {contested_pct:.1f}%</div>
+            <div><strong>Advantage:</strong> {advantage:+.0f}</div>
         </div>
     </div>
     """
@@ -1135,18 +1119,21 @@ def display_game_phase_analysis(df: pd.DataFrame):
     if total_moves == 0:
         return
     
-    # Analyze different game phases
-    opening = df[df['Move'] <= 15]
-    middlegame = df[(df['Move'] > 15) & (df['Move'] <= 40)]
-    endgame = df[df['Move'] > 40]
+    # Analyze different game phases with masks over the raw columns
+    move_numbers = df['Move'].to_numpy()
+    space_advantage = df['Space_Advantage'].to_numpy()
+    material_balance = df['Material_Balance'].to_numpy()
+    opening = move_numbers <= 15
+    middlegame = (move_numbers > 15) & (move_numbers <= 40)
+    endgame = move_numbers > 40
     
     phase_col1, phase_col2, phase_col3 = st.columns(3)
     
     with phase_col1:
         st.markdown("**Opening (1-15 moves):**")
-        if len(opening) > 0:
-            avg_space = opening['Space_Advantage'].mean()
-            avg_center = opening['Center_Control'].mean()
+        if opening.any():
+            avg_space = space_advantage[opening].mean()
+            avg_center = df['Center_Control'].to_numpy()[opening].mean()
             st.markdown(f"• Avg Space Advantage: {avg_space:+.1f}")
             st.markdown(f"• Avg Center Control: {avg_center:+.1f}")
             character = 'Dynamic' if abs(avg_space) > 5 else 'Solid'
@@ -1154,9 +1141,9 @@ def display_game_phase_analysis(df: pd.DataFrame):
     
     with phase_col2:
         st.markdown("**Middlegame (16-40 moves):**")
-        if len(middlegame) > 0:
-            avg_space = middlegame['Space_Advantage'].mean()
-            max_material = middlegame['Material_Balance'].abs().max()
+        if middlegame.any():
+            avg_space = space_advantage[middlegame].mean()
+            max_material = np.abs(material_balance[middlegame]).max()
             st.markdown(f"• Avg Space Advantage: {avg_space:+.1f}")
             st.markdown(f"• Max Material Swing: {max_material:.1f}")
             character = 'Sharp' if max_material > 2 else 'Positional'
@@ -1164,9 +1151,10 @@ def display_game_phase_analysis(df: pd.DataFrame):
     
     with phase_col3:
         st.markdown("**Endgame (40+ moves):**")
-        if len(endgame) > 0:
-            final_material = endgame['Material_Balance'].iloc[-1]
-            avg_threats = (endgame['White_King_Threats'] + endgame['Black_King_Threats']).mean()
+        if endgame.any():
+            final_material = material_balance[endgame][-1]
+            avg_threats = (df['White_King_Threats'].to_numpy()[endgame]
+                           + df['Black_King_Threats'].to_numpy()[endgame]).mean()
             st.markdown(f"• Final Material: {final_material:+.1f}")
             st.markdown(f"• Avg King Threats: {avg_threats:.1f}")
             character = 'Active' if avg_threats > 1 else 'Technical'
@@ -1177,7 +1165,7 @@ def display_comprehensive_game_statistics():
     """Display comprehensive game statistics and analysis."""
     st.markdown("#### 📈 Comprehensive Game Statistics")
     
-    game_stats = st.session_state.get('ga_game_stats', {})
+    game_stats = get_game_statistics()
     positions = st.session_state.get('ga_positions', [])
     
     if not game_stats or not positions:
@@ -1242,43 +1230,24 @@ def display_enhanced_move_list(positions: List[Dict]):
     """Display enhanced move list with analysis."""
     st.markdown("##### ♟️ Complete Move Analysis")
     
-    moves_data = []
-    for i in range(1, len(positions), 2):
-        move_num = (i + 1) // 2
-        white_pos = positions[i] if i < len(positions) else None
-        black_pos = positions[i + 1] if i + 1 < len(positions) else None
-        
-        white_move = convert_to_piece_icons(white_pos['move']) if white_pos else ""
-        black_move = convert_to_piece_icons(black_pos['move']) if black_pos else ""
-        
-        # Add move analysis
-        white_analysis = ""
-        black_analysis = ""
-        
-        if white_pos:
-            if 'x' in white_pos['move']:
-                white_analysis += " 🎯"
-            if '+' in white_pos['move']:
-                white_analysis += " ⚠️"
-            if 'O-O' in white_pos['move']:
-                white_analysis += " 🏰"
-        
-        if black_pos:
-            if 'x' in black_pos['move']:
-                black_analysis += " 🎯"
-            if '+' in black_pos['move']:
-                black_analysis += " ⚠️"
-            if 'O-O' in black_pos['move']:
-                black_analysis += " 🏰"
-        
-        moves_data.append({
-            'Move': f"{move_num}.",
-            'White': f"{white_move}{white_analysis}",
-            'Black': f"{black_move}{black_analysis}"
-        })
+    # Annotate every ply at once, then split into white and black columns
+    moves = pd.Series([p['move'] for p in positions[1:]], dtype=object)
+    annotated = (
+        pd.Series([p['move_icons'] for p in positions[1:]], dtype=object)
+        + np.where(moves.str.contains('x', regex=False), " 🎯", "")
+        + np.where(moves.str.contains('+', regex=False), " ⚠️", "")
+        + np.where(moves.str.contains('O-O', regex=False), " 🏰", "")
+    ).to_numpy()
+    
+    white_moves = annotated[0::2]
+    black_moves = np.append(annotated[1::2], [""] * (len(white_moves) - len(annotated[1::2])))
     
     # Display in a nice table
-    df_moves = pd.DataFrame(moves_data)
+    df_moves = pd.DataFrame({
+        'Move': [f"{number}." for number in range(1, len(white_moves) + 1)],
+        'White': white_moves,
+        'Black': black_moves
+    })
     st.dataframe(df_moves, use_container_width=True, hide_index=True)
     
     # Legend
@@ -1287,6 +1256,7 @@ def display_enhanced_move_list(positions: List[Dict]):
     """)
 
 
+@st.fragment
 def display_advanced_export_options():
     """Display advanced export and save options."""
     st.markdown("#### 💾 Save & Export Analysis")
@@ -1369,8 +1339,8 @@ def save_analysis_progress(game: chess.pgn.Game, analysis_name: str, notes: str)
         
         # Get current analysis state
         current_position = st.session_state.get('ga_position_index', 0)
-        game_stats = st.session_state.get('ga_game_stats', {})
-        critical_positions = st.session_state.get('ga_critical_positions', [])
+        game_stats = get_game_statistics()
+        critical_positions = get_critical_positions()
         
         analysis_data = {
             'game_headers': dict(game.headers),
@@ -1406,27 +1376,43 @@ def handle_advanced_export(game: chess.pgn.Game, export_format: str, include_opt
         st.error(f"❌ Export failed: {e}")
 
 
+@st.cache_resource(show_spinner=False)
+def _get_html_generator() -> GameHTMLGenerator:
+    """Shared HTML study generator, created once per server process."""
+    return GameHTMLGenerator()
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _render_html_study(game_key: Tuple, notes: Optional[str], critical_positions: List[Dict],
+                       include_statistics: bool, _game: chess.pgn.Game) -> Tuple[str, str]:
+    """Return (file name, HTML) of a game's study, cached on the game and export options."""
+    generator = _get_html_generator()
+    html_content = generator.generate_to_string(
+        _game,
+        analysis_notes=notes,
+        critical_positions=critical_positions,
+        include_statistics=include_statistics
+    )
+    return generator.generate_filename(dict(_game.headers)), html_content
+
+
+def _export_game_key(game: chess.pgn.Game) -> Tuple:
+    """Hashable identity of the analyzed game for export caching."""
+    return tuple(game.headers.items()), game.board().fen(), ' '.join(st.session_state['ga_moves_uci'])
+
+
 def generate_html_export(game: chess.pgn.Game):
     """Generate HTML export with enhanced features."""
     try:
         # Get analysis data
         notes = st.session_state.get('save_analysis_notes', '')
-        critical_positions = st.session_state.get('ga_critical_positions', [])
-        
-        generator = GameHTMLGenerator()
-        html_path = generator.generate(
-            game, 
-            analysis_notes=notes,
-            critical_positions=critical_positions
-        )
         
-        with open(html_path, "r", encoding="utf-8") as f:
-            html_content = f.read()
+        file_name, html_content = _render_html_study(_export_game_key(game), notes, get_critical_positions(), True, game)
         
         st.download_button(
             "⬇️ Download HTML Study",
             data=html_content,
-            file_name=Path(html_path).name,
+            file_name=file_name,
             mime="text/html",
             use_container_width=True
         )
@@ -1439,19 +1425,14 @@ def generate_html_export(game: chess.pgn.Game):
 def generate_comprehensive_html_export(game: chess.pgn.Game, include_options: List[str], notes: str):
     """Generate comprehensive HTML export with selected options."""
     try:
-        critical_positions = st.session_state.get('ga_critical_positions', []) if "Critical Positions" in include_options else []
-        
-        generator = GameHTMLGenerator()
-        html_path = generator.generate(
-            game,
-            analysis_notes=notes if "Personal Notes" in include_options else None,
-            critical_positions=critical_positions,
-            include_statistics="Statistics" in include_options
+        _, html_content = _render_html_study(
+            _export_game_key(game),
+            notes if "Personal Notes" in include_options else None,
+            get_critical_positions() if "Critical Positions" in include_options else [],
+            "Statistics" in include_options,
+            game
         )
         
-        with open(html_path, "r", encoding="utf-8") as f:
-            html_content = f.read()
-        
         st.download_button(
             "⬇️ Download Comprehensive Study",
             data=html_content,
@@ -1486,7 +1467,7 @@ def generate_enhanced_pgn_export(game: chess.pgn.Game, notes: str):
             pgn_lines.append(f"\n{{Analysis Notes: {notes}}}")
         
         # Add critical positions summary
-        critical_positions = st.session_state.get('ga_critical_positions', [])
+        critical_positions = get_critical_positions()
         if critical_positions:
             pgn_lines.append(f"\n{{Critical Positions: {len(critical_positions)} identified}}")
         
@@ -1513,15 +1494,15 @@ def generate_json_data_export(game: chess.pgn.Game, include_options: List[str]):
     try:
         export_data = {
             'game_headers': dict(game.headers),
-            'moves': [str(move) for move in game.mainline_moves()],
+            'moves': st.session_state['ga_moves_uci'],
             'export_timestamp': datetime.now().isoformat()
         }
         
         if "Statistics" in include_options:
-            export_data['game_statistics'] = st.session_state.get('ga_game_stats', {})
+            export_data['game_statistics'] = get_game_statistics()
         
         if "Critical Positions" in include_options:
-            critical_positions = st.session_state.get('ga_critical_positions', [])
+            critical_positions = get_critical_positions()
             export_data['critical_positions'] = [
                 {
                     'move_number': pos['move_number'],
@@ -1535,11 +1516,15 @@ def generate_json_data_export(game: chess.pgn.Game, include_options: List[str]):
         if "Personal Notes" in include_options:
             export_data['analysis_notes'] = st.session_state.get('save_analysis_notes', '')
         
-        json_str = json.dumps(export_data, indent=2)
+        # orjson encodes straight to bytes and is much faster when installed
+        if orjson is not None:
+            json_data = orjson.dumps(export_data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+        else:
+            json_data = json.dumps(export_data, indent=2)
         
         st.download_button(
             "⬇️ Download JSON Data",
-            data=json_str,
+            data=json_data,
             file_name=f"game_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
             mime="application/json",
             use_container_width=True
@@ -1562,8 +1547,8 @@ def generate_analysis_summary():
     st.markdown("#### 📊 Analysis Summary")
     
     game = st.session_state.get('ga_current_game')
-    game_stats = st.session_state.get('ga_game_stats', {})
-    critical_positions = st.session_state.get('ga_critical_positions', [])
+    game_stats = get_game_statistics()
+    critical_positions = get_critical_positions()
     
     if not game:
         st.warning("⚠️ No game data available")
@@ -1589,9 +1574,93 @@ def generate_analysis_summary():
 
 # Helper Functions
 
-def parse_pgn_content(pgn_content: str) -> List[chess.pgn.Game]:
-    """Parse PGN content and return list of games."""
-    games = []
+_GAME_SEARCH_SQL: Dict[Tuple, Tuple[str, str]] = {}
+
+def _game_search_sql(named_players: bool, use_fts: bool, moves_col: str,
+                     active: Tuple[str, ...]) -> Tuple[str, str]:
+    """Return the (select, where) SQL for game searches on this schema, building it once.
+    
+    Only the ``active`` filters appear in the WHERE clause, so SQLite can plan
+    them against the games indexes; each filter combination keeps one
+    statement text for the statement cache.
+    """
+    key = (named_players, use_fts, moves_col, active)
+    if key not in _GAME_SEARCH_SQL:
+        white, black = ('white_player', 'black_player') if named_players else ('white', 'black')
+        
+        # Substring filters go through the trigram index when present
+        if use_fts:
+            player_match = ("id IN (SELECT rowid FROM games_fts WHERE white_player LIKE :player "
+                            "UNION SELECT rowid FROM games_fts WHERE black_player LIKE :player)")
+            event_match = "id IN (SELECT rowid FROM games_fts WHERE event LIKE :event)"
+            opening_match = "id IN (SELECT rowid FROM games_fts WHERE opening LIKE :opening)"
+        else:
+            player_match = f"({white} LIKE :player OR {black} LIKE :player)"
+            event_match = "event LIKE :event"
+            opening_match = "opening LIKE :opening"
+        
+        conditions = {
+            'player': player_match,
+            'result': "result = :result",
+            'event': event_match,
+            'opening': opening_match,
+            'min_elo': "(COALESCE(white_elo, 0) >= :min_elo OR COALESCE(black_elo, 0) >= :min_elo)",
+            'max_elo': "(COALESCE(white_elo, 9999) <= :max_elo OR COALESCE(black_elo, 9999) <= :max_elo)",
+            'date_from': "date >= :date_from",
+            'date_to': "date <= :date_to",
+            # min_moves is only bound when positive, so NULL move counts never match
+            'min_moves': f"{moves_col} >= :min_moves"
+        }
+        where_sql = " WHERE " + " AND ".join(conditions[name] for name in active) if active else ""
+        select_sql = f"""SELECT id, {white} as white, {black} as black, 
+                         white_elo, black_elo, result, date, event, opening, 
+                         COALESCE({moves_col}, 0) as moves FROM games"""
+        _GAME_SEARCH_SQL[key] = (select_sql + where_sql, where_sql)
+    return _GAME_SEARCH_SQL[key]
+
+
+@functools.lru_cache(maxsize=1)
+def _games_columns() -> frozenset:
+    """Column names of the games table, read once per process."""
+    cursor = database.get_shared_connection().cursor()
+    cursor.execute("PRAGMA table_info(games)")
+    return frozenset(col['name'] for col in cursor.fetchall())
+
+
+@functools.lru_cache(maxsize=1)
+def _has_games_fts() -> bool:
+    """Whether the games_fts trigram index exists, checked once per process."""
+    cursor = database.get_shared_connection().cursor()
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='games_fts'")
+    return cursor.fetchone() is not None
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _total_games() -> int:
+    """Total number of stored games, refreshed at most once a minute."""
+    cursor = database.get_shared_connection().cursor()
+    cursor.execute("SELECT COUNT(*) FROM games")
+    return cursor.fetchone()[0]
+
+
+def count_database_games(where_sql: str, params: Dict[str, Any], cap: int) -> int:
+    """Count games matching a search WHERE clause, stopping once ``cap`` are found."""
+    cursor = database.get_shared_connection().cursor()
+    cursor.execute("SELECT COUNT(*) FROM (SELECT 1 FROM games" + where_sql + " LIMIT :cap)",
+                   {**params, 'cap': cap})
+    return cursor.fetchone()[0]
+
+
+def search_database_games(sql: str, params: Dict[str, Any], limit: int, offset: int = 0) -> List[Dict]:
+    """Fetch one page of games for a search query, newest first."""
+    cursor = database.get_shared_connection().cursor()
+    cursor.execute(sql + " ORDER BY id DESC LIMIT :limit OFFSET :offset",
+                   {**params, 'limit': limit, 'offset': offset})
+    return [dict(row) for row in cursor.fetchall()]
+
+
+def parse_pgn_content(pgn_content: str) -> Iterator[chess.pgn.Game]:
+    """Parse PGN content lazily, yielding one game at a time."""
     pgn_io = io.StringIO(pgn_content)
     
     while True:
@@ -1599,12 +1668,98 @@ def parse_pgn_content(pgn_content: str) -> List[chess.pgn.Game]:
             game = chess.pgn.read_game(pgn_io)
             if game is None:
                 break
-            games.append(game)
         except Exception as e:
             st.warning(f"⚠️ Error parsing game: {e}")
             break
+        yield game
+
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def load_first_game(pgn_text: str) -> Optional[chess.pgn.Game]:
+    """First game of a PGN, parsed once per text and shared read-only.
+    
+    The parsed game is kept whole, so comments, NAGs and variations reach
+    the PGN display and exports.
+    """
+    return next(parse_pgn_content(pgn_text), None)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _fetch_game_row(game_id: int) -> Optional[Dict[str, Any]]:
+    """Fetch the columns needed to rebuild a stored game, cached by id."""
+    cursor = database.get_shared_connection().cursor()
+    columns = _games_columns()
+    
+    pgn_col = 'pgn_text' if 'pgn_text' in columns else 'NULL AS pgn_text'
+    player_cols = ('white_player AS white, black_player AS black'
+                   if 'white_player' in columns else 'white, black')
+    cursor.execute(f"""
+        SELECT {pgn_col}, {player_cols}, result, date, event, moves_data
+        FROM games WHERE id = ?
+    """, (game_id,))
+    result = cursor.fetchone()
+    return dict(result) if result else None
+
+
+_spatial_metrics_cache: Dict[Tuple, Dict[str, Any]] = {}
+_spatial_metrics_lock = threading.Lock()
+
+def _cached_spatial_metrics(board: chess.Board) -> Dict[str, Any]:
+    """Spatial metrics for a position, cached by transposition key across games.
+    
+    The key ignores move counters, so transposed and repeated positions
+    share one entry. Sessions run on separate threads, so the cache is only
+    touched under a lock; metrics themselves are computed outside it.
+    """
+    key = board._transposition_key()
+    with _spatial_metrics_lock:
+        metrics = _spatial_metrics_cache.pop(key, None)
+        if metrics is not None:
+            _spatial_metrics_cache[key] = metrics
+            return metrics
+    
+    if spatial_analysis is None:
+        return {}
+    metrics = spatial_analysis.calculate_comprehensive_spatial_metrics(board)
+    
+    with _spatial_metrics_lock:
+        _spatial_metrics_cache[key] = metrics
+        while len(_spatial_metrics_cache) > SPATIAL_METRICS_CACHE_SIZE:
+            _spatial_metrics_cache.pop(next(iter(_spatial_metrics_cache)))
+    return metrics
+
+
+@functools.lru_cache(maxsize=512)
+def _cached_board_svg(fen: str, flipped: bool, size: int, style: str) -> str:
+    """Board SVG for a position, cached so scrubbing revisits are lookups."""
+    return chess.svg.board(board=chess.Board(fen), flipped=flipped, size=size, style=style)
+
+
+def open_uploaded_pgn(uploaded_file) -> TextIO:
+    """Open an uploaded PGN as a text stream over its bytes, without decoding it to a str first."""
+    return io.TextIOWrapper(io.BytesIO(uploaded_file.getvalue()), encoding='utf-8', newline='')
+
+
+def parse_pgn_headers(pgn_io: TextIO) -> List[Tuple[int, chess.pgn.Headers]]:
+    """Scan a PGN stream for game headers without parsing moves.
+    
+    Returns (offset, headers) pairs; seek a stream over the same content to
+    an offset and call chess.pgn.read_game to parse that game in full.
+    """
+    index = []
+    
+    while True:
+        try:
+            offset = pgn_io.tell()
+            headers = chess.pgn.read_headers(pgn_io)
+            if headers is None:
+                break
+            index.append((offset, headers))
+        except Exception as e:
+            st.warning(f"⚠️ Error reading game headers: {e}")
+            break
     
-    return games
+    return index
 
 
 def calculate_enhanced_positions(game: chess.pgn.Game) -> List[Dict[str, Any]]:
@@ -1613,42 +1768,55 @@ def calculate_enhanced_positions(game: chess.pgn.Game) -> List[Dict[str, Any]]:
     positions = []
     move_number = 1
     
+    # Piece counts, updated per move rather than recounted
+    counts = _piece_counts(board)
+    
     # Starting position with enhanced analysis
     try:
-        import spatial_analysis
-        start_metrics = spatial_analysis.calculate_comprehensive_spatial_metrics(board)
+        start_metrics = _cached_spatial_metrics(board)
     except:
         start_metrics = {}
     
     positions.append({
         'move_number': 0,
         'move': 'Starting Position',
+        'move_icons': None,
         'fen': board.fen(),
         'turn': 'white',
-        'board': board.copy(),
-        'spatial_metrics': start_metrics
+        'spatial_metrics': start_metrics,
+        **summarize_position(board, start_metrics, _material_from_counts(counts))
     })
     
     # Process all moves with enhanced analysis
     for move in game.mainline_moves():
         color = 'white' if board.turn else 'black'
         san_move = board.san(move)
+        
+        if board.is_capture(move):
+            captured = chess.PAWN if board.is_en_passant(move) else board.piece_type_at(move.to_square)
+            counts[not board.turn][captured] -= 1
+        if move.promotion:
+            counts[board.turn][chess.PAWN] -= 1
+            counts[board.turn][move.promotion] += 1
+        
         board.push(move)
+        fen = board.fen()
         
         # Calculate spatial metrics for each position
         try:
-            import spatial_analysis
-            metrics = spatial_analysis.calculate_comprehensive_spatial_metrics(board)
+            metrics = _cached_spatial_metrics(board)
         except:
             metrics = {}
         
         positions.append({
             'move_number': move_number,
             'move': san_move,
-            'fen': board.fen(),
+            'move_icons': convert_to_piece_icons(san_move),
+            'uci': move.uci(),
+            'fen': fen,
             'turn': color,
-            'board': board.copy(),
-            'spatial_metrics': metrics
+            'spatial_metrics': metrics,
+            **summarize_position(board, metrics, _material_from_counts(counts))
         })
         
         if color == 'black':
@@ -1657,40 +1825,57 @@ def calculate_enhanced_positions(game: chess.pgn.Game) -> List[Dict[str, Any]]:
     return positions
 
 
-def calculate_enhanced_material(board: chess.Board) -> Dict[str, Any]:
-    """Calculate enhanced material analysis."""
-    piece_values = {
-        chess.PAWN: 1, chess.KNIGHT: 3, chess.BISHOP: 3,
-        chess.ROOK: 5, chess.QUEEN: 9, chess.KING: 0
-    }
-    
-    white_pieces = []
-    black_pieces = []
-    white_total = 0
-    black_total = 0
+def summarize_position(board: chess.Board, metrics: Dict[str, Any],
+                       material: Dict[str, Any]) -> Dict[str, Any]:
+    """Precompute the per-position scalars the interactive views read on every rerun."""
+    space_adv = metrics.get('space_control', {}).get('space_advantage', 0)
+    white_moves, black_moves = _mobility_counts(board)
     
-    for square in chess.SQUARES:
-        piece = board.piece_at(square)
-        if piece:
-            value = piece_values.get(piece.piece_type, 0)
-            piece_name = chess.piece_name(piece.piece_type)
-            
-            if piece.color == chess.WHITE:
-                white_total += value
-                white_pieces.append(piece_name[0].upper())
-            else:
-                black_total += value
-                black_pieces.append(piece_name[0].upper())
+    return {
+        'material': material,
+        'material_diff': material['difference'],
+        'space_adv': space_adv,
+        'white_moves': white_moves,
+        'black_moves': black_moves,
+        'development': assess_development(board),
+        'assessment': generate_position_assessment(material['difference'], space_adv)
+    }
+
+
+def _mobility_counts(board: chess.Board) -> Tuple[int, int]:
+    """Legal move counts for (white, black) without mutating the board."""
+    # The side not to move is counted on a stackless copy with the turn flipped
+    opponent = board.copy(stack=False)
+    opponent.turn = not board.turn
+    side_moves = board.legal_moves.count()
+    opponent_moves = opponent.legal_moves.count()
+    return (side_moves, opponent_moves) if board.turn == chess.WHITE else (opponent_moves, side_moves)
+
+
+def _material_from_counts(counts: List[List[int]]) -> Dict[str, Any]:
+    """Material analysis from piece counts indexed [colour][piece type]."""
+    white_total = sum(value * count for value, count in zip(PIECE_VALUES, counts[chess.WHITE]))
+    black_total = sum(value * count for value, count in zip(PIECE_VALUES, counts[chess.BLACK]))
     
     return {
         'white_total': white_total,
         'black_total': black_total,
-        'difference': white_total - black_total,
-        'white_pieces': ''.join(sorted(white_pieces)),
-        'black_pieces': ''.join(sorted(black_pieces))
+        'difference': white_total - black_total
     }
 
 
+def _piece_letters(board: chess.Board, color: chess.Color) -> str:
+    """Sorted piece letters for one side, built only when they are displayed."""
+    return ''.join(chess.piece_name(piece_type)[0].upper() * chess.popcount(board.pieces_mask(piece_type, color))
+                   for piece_type in PIECE_LETTER_ORDER)
+
+
+def _piece_counts(board: chess.Board) -> List[List[int]]:
+    """Piece counts indexed [colour][piece type] (chess.BLACK == 0, chess.WHITE == 1)."""
+    return [[chess.popcount(board.pieces_mask(piece_type, color)) if piece_type else 0
+             for piece_type in range(7)] for color in (chess.BLACK, chess.WHITE)]
+
+
 def assess_development(board: chess.Board) -> str:
     """Assess piece development for current position."""
     # Simple development assessment
@@ -1718,20 +1903,8 @@ def assess_development(board: chess.Board) -> str:
         return "Under-developed"
 
 
-def generate_position_assessment(position: Dict) -> str:
+def generate_position_assessment(material_diff: float, space_advantage: float) -> str:
     """Generate overall position assessment."""
-    board = position['board']
-    spatial_metrics = position.get('spatial_metrics', {})
-    
-    # Material assessment
-    material = calculate_enhanced_material(board)
-    material_diff = material['difference']
-    
-    # Space control assessment
-    space_advantage = 0
-    if spatial_metrics.get('space_control'):
-        space_advantage = spatial_metrics['space_control'].get('space_advantage', 0)
-    
     # Generate assessment
     if abs(material_diff) > 3:
         return f"Material advantage: {'White' if material_diff > 0 else 'Black'} clearly better"
@@ -1745,58 +1918,60 @@ def generate_position_assessment(position: Dict) -> str:
         return "Balanced position"
 
 
+def get_critical_positions() -> List[Dict]:
+    """Critical positions of the analyzed game, identified on first use."""
+    if 'ga_critical_positions' not in st.session_state:
+        st.session_state['ga_critical_positions'] = identify_critical_positions(st.session_state.get('ga_positions', []))
+    return st.session_state['ga_critical_positions']
+
+
+def get_game_statistics() -> Dict[str, Any]:
+    """Statistics of the analyzed game, calculated on first use."""
+    if 'ga_game_stats' not in st.session_state:
+        st.session_state['ga_game_stats'] = calculate_comprehensive_game_statistics(st.session_state.get('ga_positions', []))
+    return st.session_state['ga_game_stats']
+
+
 def identify_critical_positions(positions: List[Dict]) -> List[Dict]:
     """Identify critical positions based on evaluation changes."""
-    if not positions:
+    if len(positions) < 2:
         return []
     
-    critical_positions = []
-    previous_material = 0
+    # Flag every ply at once from the stored material and SAN, skipping the starting position
+    moves = [position['move'] for position in positions[1:]]
+    material = np.fromiter((position['material_diff'] for position in positions[1:]), dtype=np.float64, count=len(moves))
+    material_changes = np.abs(np.diff(material, prepend=0))
+    checks = np.fromiter(('+' in move or '#' in move for move in moves), dtype=bool, count=len(moves))
+    plies = np.arange(1, len(positions))
+    critical = (material_changes > 3) | checks | (plies % 15 == 0)  # Swings, checks and periodic checkpoints
     
-    for i, position in enumerate(positions[1:], 1):  # Skip starting position
-        try:
-            board = position['board']
-            material_data = calculate_enhanced_material(board)
-            current_material = material_data['difference']
-            
-            # Calculate material change
-            material_change = abs(current_material - previous_material)
-            
-            # Identify critical moments
-            is_critical = False
-            reason = ""
-            
-            if material_change > 3:
-                is_critical = True
-                reason = f"Major material swing: {material_change:.1f}"
-            elif board.is_check():
-                is_critical = True
-                reason = "Check given"
-            elif board.is_checkmate():
-                is_critical = True
-                reason = "Checkmate"
-            elif i % 15 == 0:  # Periodic checkpoints
-                is_critical = True
-                reason = f"Strategic checkpoint (move {position['move_number']})"
-            
-            if is_critical:
-                critical_positions.append({
-                    'index': i,
-                    'move_number': position['move_number'],
-                    'move': position['move'],
-                    'fen': position['fen'],
-                    'board': position['board'],
-                    'reason': reason,
-                    'material_change': material_change,
-                    'current_evaluation': current_material
-                })
-            
-            previous_material = current_material
-            
-        except Exception:
-            continue
+    critical_positions = []
+    for offset in np.flatnonzero(critical)[:10]:  # Limit to 10 critical positions
+        i = int(plies[offset])
+        position = positions[i]
+        material_change = abs(position['material_diff'] - (positions[i - 1]['material_diff'] if i > 1 else 0))
+        is_check = bool(checks[offset])
+        
+        if material_change > 3:
+            reason = f"Major material swing: {material_change:.1f}"
+        elif is_check:
+            reason = "Check given"
+        else:
+            reason = f"Strategic checkpoint (move {position['move_number']})"
+        
+        critical_positions.append({
+            'index': i,
+            'move_number': position['move_number'],
+            'move': position['move'],
+            'fen': position['fen'],
+            'reason': reason,
+            'material_change': material_change,
+            'current_evaluation': position['material_diff'],
+            'is_check': is_check,
+            'is_checkmate': '#' in position['move']
+        })
     
-    return critical_positions[:10]  # Limit to 10 critical positions
+    return critical_positions
 
 
 def calculate_comprehensive_game_statistics(positions: List[Dict]) -> Dict[str, Any]:
@@ -1816,37 +1991,37 @@ def calculate_comprehensive_game_statistics(positions: List[Dict]) -> Dict[str,
         'complexity_score': 0
     }
     
-    material_values = []
-    previous_material = 0
+    captures = checks = castling_moves = material_swings = 0
+    material_sum = max_material = previous_material = 0
     
-    for i, position in enumerate(positions[1:], 1):
+    # One pass over the stored SAN and material, keeping running totals
+    for position in positions[1:]:
         move = position.get('move', '')
         
         # Count move types
         if 'x' in move:
-            stats['captures'] += 1
+            captures += 1
         if '+' in move:
-            stats['checks'] += 1
-        if 'O-O' in move:
-            stats['castling_moves'] += 1
+            checks += 1
+        if move.startswith('O-O'):
+            castling_moves += 1
         
         # Material analysis
-        try:
-            material_data = calculate_enhanced_material(position['board'])
-            current_material = material_data['difference']
-            material_values.append(abs(current_material))
-            
-            if abs(current_material - previous_material) > 2:
-                stats['material_swings'] += 1
-            
-            previous_material = current_material
-        except:
-            pass
+        current_material = position['material_diff']
+        material = abs(current_material)
+        material_sum += material
+        if material > max_material:
+            max_material = material
+        if abs(current_material - previous_material) > 2:
+            material_swings += 1
+        previous_material = current_material
+    
+    stats.update(captures=captures, checks=checks, castling_moves=castling_moves, material_swings=material_swings)
     
     # Calculate averages and statistics
-    if material_values:
-        stats['average_material_balance'] = sum(material_values) / len(material_values)
-        stats['max_material_advantage'] = max(material_values)
+    if stats['total_moves']:
+        stats['average_material_balance'] = material_sum / stats['total_moves']
+        stats['max_material_advantage'] = max_material
     
     # Game complexity score
     stats['complexity_score'] = min(10, (
@@ -1866,77 +2041,60 @@ def calculate_comprehensive_game_statistics(positions: List[Dict]) -> Dict[str,
     return stats
 
 
+@functools.lru_cache(maxsize=8192)
 def convert_to_piece_icons(move_string: str) -> str:
     """Convert move notation to use piece icons."""
-    if not move_string:
-        return move_string
-    
-    piece_icons = {
-        'K': '♔', 'Q': '♕', 'R': '♖', 'B': '♗', 'N': '♘'
-    }
-    
-    result = move_string
-    for piece, icon in piece_icons.items():
-        result = result.replace(piece, icon)
-    
-    return result
+    return piece_icons(move_string)
 
 
-def display_enhanced_games_grid(games: List[Dict]):
+def display_enhanced_games_grid(search: Dict[str, Any]):
     """Display games in an enhanced grid with detailed information."""
-    st.markdown(f"#### 📊 Found {len(games)} Games")
+    total = search['total']
+    st.markdown(f"#### 📊 Found {total} Games")
     
-    # Pagination for large result sets
+    # Pagination for large result sets; only the current page is fetched
     games_per_page = 10
-    total_pages = math.ceil(len(games) / games_per_page)
+    total_pages = (total + games_per_page - 1) // games_per_page
     
+    page = 1
     if total_pages > 1:
         page = st.selectbox("Page:", range(1, total_pages + 1), key="games_pagination")
+    
+    # Keep the current page's rows with the search so reruns on the same page skip the query
+    if search.get('page') != page:
         start_idx = (page - 1) * games_per_page
-        end_idx = start_idx + games_per_page
-        display_games = games[start_idx:end_idx]
-    else:
-        display_games = games
+        try:
+            search['rows'] = search_database_games(
+                search['sql'], search['params'],
+                limit=min(games_per_page, total - start_idx), offset=start_idx
+            )
+        except Exception as e:
+            st.error(f"❌ Search error: {e}")
+            return
+        search['page'] = page
+    display_games = search['rows']
     
     # Enhanced game cards
     for i, game in enumerate(display_games):
-        with st.container():
-            # Enhanced game card with more details
-            st.markdown(f"""
-            <div style="
-                background: white;
-                padding: 1.5rem;
-                border-radius: 12px;
-                border: 1px solid #e2e8f0;
-                margin-bottom: 1rem;
-                box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-            ">
-                <div style="display: flex; justify-content: space-between; align-items: start;">
-                    <div style="flex: 1;">
-                        <h4 style="margin: 0 0 0.5rem 0; color: #1a202c;">
-                            {game.get('white', 'Unknown')} vs {game.get('black', 'Unknown')}
-                        </h4>
-                        <div style="color: #718096; font-size: 0.9rem; margin-bottom: 0.5rem;">
-                            <strong>Result:</strong> {game.get('result', '*')} • 
-                            <strong>Moves:</strong> {game.get('moves', 0)} • 
-                            <strong>Date:</strong> {game.get('date', 'Unknown')}
-                        </div>
-                        <div style="color: #4a5568; font-size: 0.85rem;">
-                            <strong>Event:</strong> {game.get('event', 'Unknown')[:40]}{'...' if len(str(game.get('event', ''))) > 40 else ''}<br>
-                            <strong>Opening:</strong> {game.get('opening', 'Unknown')[:40]}{'...' if len(str(game.get('opening', ''))) > 40 else ''}<br>
-                            <strong>ELOs:</strong> {game.get('white_elo', '?')} / {game.get('black_elo', '?')}
-                        </div>
-                    </div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            # Analyze button
-            col1, col2, col3 = st.columns([2, 1, 1])
-            with col2:
-                if st.button("🎯 Analyze Game", key=f"analyze_{game['id']}_{i}", use_container_width=True, type="primary"):
-                    load_game_from_database(game['id'])
-            with col3:
-                if st.button("👁️ Quick View", key=f"preview_{game['id']}_{i}", use_container_width=True):
-                    show_game_preview(game)
+        # Enhanced game card with more details
+        st.markdown(GAME_CARD_HTML.format(
+            white=game.get('white', 'Unknown'),
+            black=game.get('black', 'Unknown'),
+            result=game.get('result', '*'),
+            moves=game.get('moves', 0),
+            date=game.get('date', 'Unknown'),
+            event=game.get('event', 'Unknown')[:40] + ('...' if len(str(game.get('event', ''))) > 40 else ''),
+            opening=game.get('opening', 'Unknown')[:40] + ('...' if len(str(game.get('opening', ''))) > 40 else ''),
+            white_elo=game.get('white_elo', '?'),
+            black_elo=game.get('black_elo', '?')
+        ), unsafe_allow_html=True)
+        
+        # Analyze button
+        col1, col2, col3 = st.columns([2, 1, 1])
+        with col2:
+            if st.button("🎯 Analyze Game", key=f"analyze_{game['id']}_{i}", use_container_width=True, type="primary"):
+                load_game_from_database(game['id'])
+        with col3:
+            if st.button("👁️ Quick View", key=f"preview_{game['id']}_{i}", use_container_width=True):
+                show_game_preview(game)
 
@@ -32,6 +32,8 @@ import chess
 import chess.pgn
 import chess.svg
 
+from chess_board import piece_icons
+
 
 class GameHTMLGenerator:
     """
@@ -69,6 +71,39 @@ class GameHTMLGenerator:
             Path to generated HTML file
         """
         
+        html_content = self.generate_to_string(
+            game,
+            analysis_notes=analysis_notes,
+            critical_positions=critical_positions,
+            include_variations=include_variations,
+            include_statistics=include_statistics,
+            snapshot_frequency=snapshot_frequency
+        )
+        
+        # Generate filename and save
+        filename = self.generate_filename(dict(game.headers))
+        filepath = self.output_dir / filename
+        
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(html_content)
+            
+        return str(filepath)
+    
+    def generate_to_string(self, game: chess.pgn.Game, *, 
+                           analysis_notes: Optional[str] = None,
+                           critical_positions: Optional[List[Dict]] = None,
+                           include_variations: bool = True,
+                           include_statistics: bool = True,
+                           snapshot_frequency: int = 6) -> str:
+        """
+        Generate the HTML study report in memory, without writing it to disk.
+        
+        Takes the same arguments as generate().
+        
+        Returns:
+            Complete HTML document
+        """
+        
         # Extract game data
         headers = dict(game.headers)
         moves_san = self._extract_moves_with_analysis(game)
@@ -76,7 +111,7 @@ class GameHTMLGenerator:
         game_statistics = self._calculate_game_statistics(game) if include_statistics else {}
         
         # Build comprehensive HTML document
-        html_content = self._build_html_document(
+        return self._build_html_document(
             headers=headers,
             moves=moves_san,
             key_positions=key_positions,
@@ -84,15 +119,6 @@ class GameHTMLGenerator:
             analysis_notes=analysis_notes,
             critical_positions=critical_positions or []
         )
-        
-        # Generate filename and save
-        filename = self._generate_filename(headers)
-        filepath = self.output_dir / filename
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-            
-        return str(filepath)
     
     def _build_html_document(self, *, headers: Dict, moves: List[Dict], 
                            key_positions: List[Tuple], statistics: Dict,
@@ -909,7 +935,7 @@ p {
         critical_html = ""
         for i, pos in enumerate(critical_positions[:4]):  # Limit to 4 for layout
             try:
-                board_svg = chess.svg.board(board=pos['board'], size=300)
+                board_svg = chess.svg.board(board=chess.Board(pos['fen']), size=300)
                 move_display = self._convert_to_icons(pos['move'])
                 
                 critical_html += f"""
@@ -1227,21 +1253,9 @@ p {
     
     def _convert_to_icons(self, san: str) -> str:
         """Convert piece letters to Unicode chess symbols."""
-        if not san:
-            return san
-        
-        icons = {
-            'K': '♔', 'Q': '♕', 'R': '♖', 
-            'B': '♗', 'N': '♘'
-        }
-        
-        result = san
-        for letter, icon in icons.items():
-            result = result.replace(letter, icon)
-        
-        return result
+        return piece_icons(san)
     
-    def _generate_filename(self, headers: Dict) -> str:
+    def generate_filename(self, headers: Dict) -> str:
         """Generate a safe filename for the HTML file."""
         white = headers.get('White', 'White').replace(' ', '_')
         black = headers.get('Black', 'Black').replace(' ', '_')
@@ -7,6 +7,7 @@ import chess.svg
 from datetime import datetime
 from typing import Dict, Any, List, Optional, Tuple
 from move_comparison_analyzer import MoveComparisonAnalyzer
+from chess_board import PIECE_ICON_TABLE
 
 
 class ComprehensiveHTMLGenerator:
@@ -88,21 +89,11 @@ class ComprehensiveHTMLGenerator:
 
     def convert_to_piece_icons(self, move_string: str) -> str:
         """Convert move notation to use piece icons instead of letters."""
-        piece_icons = {
-            'K': '♔', 'Q': '♕', 'R': '♖', 'B': '♗', 'N': '♘'
-        }
-        
         if not move_string:
             return move_string
         
-        # Handle different move formats
-        result = move_string
-        
         # Replace piece letters with icons (but not pawns)
-        for piece, icon in piece_icons.items():
-            result = result.replace(piece, icon)
-        
-        return result
+        return move_string.translate(PIECE_ICON_TABLE)
 
 
     def get_dynamic_task_description(self, position_data: Dict[str, Any]) -> str:
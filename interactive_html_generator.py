@@ -6,6 +6,7 @@ import chess
 import chess.svg
 from datetime import datetime
 from typing import Dict, Any, List, Optional, Tuple
+from chess_board import PIECE_ICON_TABLE
 
 class InteractiveHTMLGenerator:
     """Enhanced mobile-first interactive chess analyzer with superior UX for learning."""
@@ -2444,15 +2445,7 @@ class InteractiveHTMLGenerator:
 
     def convert_to_piece_icons(self, move_string: str) -> str:
         """Convert move notation to use piece icons instead of letters."""
-        piece_icons = {
-            'K': '♔', 'Q': '♕', 'R': '♖', 'B': '♗', 'N': '♘'
-        }
-        
         if not move_string:
             return move_string
         
-        result = move_string
-        for piece, icon in piece_icons.items():
-            result = result.replace(piece, icon)
-        
-        return result
+        return move_string.translate(PIECE_ICON_TABLE)
@@ -224,7 +224,7 @@ class JSONLProcessor:
             return data['game_phase']
         
         # Simple heuristic based on material
-        piece_count = len([sq for sq in chess.SQUARES if board.piece_at(sq)])
+        piece_count = chess.popcount(board.occupied)
         if piece_count > 20:
             return 'opening'
         elif piece_count > 12:
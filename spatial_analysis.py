@@ -1,4 +1,5 @@
 # spatial_analysis.py - Spatial Analysis Module for Kuikma
+import sqlite3
 import chess
 import numpy as np
 import pandas as pd
@@ -6,6 +7,7 @@ import streamlit as st
 from typing import Dict, List, Tuple, Any, Optional
 import plotly.graph_objects as go
 import plotly.express as px
+from chess_board import PIECE_VALUES, material_totals
 
 def display_spatial_analysis():
     """Display comprehensive spatial analysis interface."""
@@ -51,7 +53,7 @@ def display_position_spatial_analysis():
         if st.button("Load Position"):
             position_data = load_position_from_database(position_id)
             if position_data:
-                fen = position_data.get('fen')
+                fen = position_data['fen']
     
     else:  # Current training position
         if 'current_position' in st.session_state:
@@ -344,29 +346,24 @@ def calculate_comprehensive_spatial_metrics(board: chess.Board) -> Dict[str, Any
 
 def calculate_space_control_advanced(board: chess.Board) -> Dict[str, Any]:
     """Calculate advanced space control metrics."""
-    control_matrix = np.zeros((8, 8), dtype=int)
-    white_attacks = np.zeros((8, 8), dtype=int)
-    black_attacks = np.zeros((8, 8), dtype=int)
-    
-    # Calculate attacks for each square
-    for square in chess.SQUARES:
-        # White attacks
-        white_attackers = board.attackers(chess.WHITE, square)
-        white_attacks[square // 8][square % 8] = len(white_attackers)
-        
-        # Black attacks
-        black_attackers = board.attackers(chess.BLACK, square)
-        black_attacks[square // 8][square % 8] = len(black_attackers)
-        
-        # Determine control
-        if white_attacks[square // 8][square % 8] > black_attacks[square // 8][square % 8]:
-            control_matrix[square // 8][square % 8] = 1  # White control
-        elif black_attacks[square // 8][square % 8] > white_attacks[square // 8][square % 8]:
-            control_matrix[square // 8][square % 8] = -1  # Black control
-        elif white_attacks[square // 8][square % 8] > 0 and black_attacks[square // 8][square % 8] > 0:
-            control_matrix[square // 8][square % 8] = 2  # Contested
-        else:
-            control_matrix[square // 8][square % 8] = 0  # Neutral
+    # Attack counts for every square, indexed by square (rank-major like control_matrix)
+    white_attacks = np.fromiter(
+        (chess.popcount(board.attackers_mask(chess.WHITE, square)) for square in chess.SQUARES),
+        dtype=int, count=64
+    ).reshape(8, 8)
+    black_attacks = np.fromiter(
+        (chess.popcount(board.attackers_mask(chess.BLACK, square)) for square in chess.SQUARES),
+        dtype=int, count=64
+    ).reshape(8, 8)
+    
+    # Determine control: 1 white, -1 black, 2 contested, 0 neutral
+    control_matrix = np.select(
+        [white_attacks > black_attacks,
+         black_attacks > white_attacks,
+         (white_attacks > 0) & (black_attacks > 0)],
+        [1, -1, 2],
+        default=0
+    )
     
     # Calculate space percentages
     total_squares = 64
@@ -436,6 +433,11 @@ def calculate_piece_activity(board: chess.Board) -> Dict[str, Any]:
     
     piece_types = [chess.PAWN, chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN, chess.KING]
     
+    # Group legal moves by origin square in a single pass
+    moves_from = {}
+    for move in board.legal_moves:
+        moves_from[move.from_square] = moves_from.get(move.from_square, 0) + 1
+    
     for color in [chess.WHITE, chess.BLACK]:
         color_key = 'white' if color == chess.WHITE else 'black'
         
@@ -449,9 +451,7 @@ def calculate_piece_activity(board: chess.Board) -> Dict[str, Any]:
             for square in pieces:
                 # Calculate mobility (number of legal moves)
                 if piece_type != chess.KING:  # Skip king for mobility
-                    piece_moves = len([move for move in board.legal_moves 
-                                     if move.from_square == square])
-                    total_mobility += piece_moves
+                    total_mobility += moves_from.get(square, 0)
                 
                 # Calculate attacks
                 attacks = len(board.attacks(square))
@@ -574,27 +574,22 @@ def calculate_tactical_threats(board: chess.Board) -> Dict[str, Any]:
     threats = {'white': [], 'black': [], 'hanging_pieces': []}
     
     # Check for hanging pieces (pieces attacked by less valuable pieces)
-    piece_values = {chess.PAWN: 1, chess.KNIGHT: 3, chess.BISHOP: 3, 
-                   chess.ROOK: 5, chess.QUEEN: 9, chess.KING: 0}
+    piece_map = board.piece_map()
     
-    for square in chess.SQUARES:
-        piece = board.piece_at(square)
-        if not piece:
-            continue
-        
-        attackers = board.attackers(not piece.color, square)
-        defenders = board.attackers(piece.color, square)
+    for square in sorted(piece_map):
+        piece = piece_map[square]
+        attackers = board.attackers_mask(not piece.color, square)
         
         if attackers:
             # Find weakest attacker
-            weakest_attacker_value = min(piece_values[board.piece_at(att).piece_type] 
-                                       for att in attackers if board.piece_at(att))
+            weakest_attacker_value = min(PIECE_VALUES[piece_map[att].piece_type]
+                                         for att in chess.scan_forward(attackers))
             
-            if not defenders or weakest_attacker_value < piece_values[piece.piece_type]:
+            if not board.attackers_mask(piece.color, square) or weakest_attacker_value < PIECE_VALUES[piece.piece_type]:
                 threats['hanging_pieces'].append({
                     'square': chess.square_name(square),
                     'piece': piece.symbol(),
-                    'value': piece_values[piece.piece_type],
+                    'value': PIECE_VALUES[piece.piece_type],
                     'attacker_value': weakest_attacker_value
                 })
     
@@ -1090,52 +1085,26 @@ def validate_board_state(board: chess.Board) -> bool:
     except Exception:
         return False
 
-def load_position_from_database(position_id: int) -> Optional[Dict[str, Any]]:
+def load_position_from_database(position_id: int) -> Optional[sqlite3.Row]:
     """Load position data from database."""
     try:
         import database
-        
-        conn = database.get_db_connection()
-        cursor = conn.cursor()
+        cursor = database.get_shared_connection().cursor()
         
         cursor.execute('SELECT * FROM positions WHERE id = ?', (position_id,))
-        position_row = cursor.fetchone()
-        
-        if position_row:
-            position_data = dict(position_row)
-            # Parse JSON fields if needed
-            return position_data
-        
-        conn.close()
-        return None
+        return cursor.fetchone()
         
-    except Exception as e:
+    except sqlite3.Error as e:
         st.error(f"Error loading position from database: {e}")
         return None
 
 # Legacy functions for backward compatibility
 def calculate_material_balance(board: chess.Board) -> Dict[str, float]:
     """Calculate material balance between sides."""
-    piece_values = {
-        chess.PAWN: 1,
-        chess.KNIGHT: 3,
-        chess.BISHOP: 3,
-        chess.ROOK: 5,
-        chess.QUEEN: 9,
-        chess.KING: 0
-    }
-    
-    white_total = 0
-    black_total = 0
-    
-    for square in chess.SQUARES:
-        piece = board.piece_at(square)
-        if piece:
-            value = piece_values.get(piece.piece_type, 0)
-            if piece.color == chess.WHITE:
-                white_total += value
-            else:
-                black_total += value
+    white_total, black_total = material_totals(
+        board.pawns, board.knights, board.bishops, board.rooks, board.queens,
+        board.occupied_co[chess.WHITE], board.occupied_co[chess.BLACK]
+    )
     
     return {
         'white_total': float(white_total),
@@ -15,6 +15,7 @@ from jsonl_processor import JSONLProcessor
 import re
 # html table rendering fix
 from streamlit.components.v1 import html
+from chess_board import PIECE_ICON_TABLE
 
 
 def display_training_interface():
@@ -165,13 +166,7 @@ def convert_pgn_to_piece_icons(pgn_string):
     if not pgn_string:
         return ""
     
-    piece_icons = {
-        'K': '♔', 'Q': '♕', 'R': '♖', 'B': '♗', 'N': '♘'
-    }
-    result = pgn_string
-    for piece, icon in piece_icons.items():
-        result = result.replace(piece, icon)
-    return result
+    return pgn_string.translate(PIECE_ICON_TABLE)
 
 def display_position_info_bar(position_data: Dict[str, Any]):
     """Display the enhanced info bar with position details and timer."""
@@ -521,38 +516,12 @@ def display_legal_move_selection(position_data: Dict[str, Any]):
     
     try:
         fen = position_data.get('fen', '')
-        board = chess.Board(fen)
-        
-        # Get all legal moves
-        legal_moves = list(board.legal_moves)
+        move_options, move_details = get_legal_move_choices(fen)
         
-        if not legal_moves:
+        if not move_options:
             st.warning("No legal moves available for this position.")
             return
         
-        # Convert legal moves to algebraic notation
-        move_options = []
-        move_details = []
-        
-        for move in legal_moves:
-            # Convert to algebraic notation
-            algebraic_move = board.san(move)
-            uci_move = move.uci()
-            
-            # Format with piece icons
-            formatted_move = convert_to_piece_icons(algebraic_move)
-            
-            move_options.append(f"{formatted_move}")
-            move_details.append({
-                'move': algebraic_move,
-                'uci': uci_move,
-                'formatted': formatted_move
-            })
-        
-        # Sort moves alphabetically for consistent display
-        sorted_moves = sorted(zip(move_options, move_details), key=lambda x: x[0])
-        move_options, move_details = zip(*sorted_moves)
-        
         # Move selection
         selected_move_index = st.selectbox(
             "Choose your move:",
@@ -588,6 +557,38 @@ def display_legal_move_selection(position_data: Dict[str, Any]):
         # Fallback to original method if legal move generation fails
         display_fallback_move_selection(position_data)
 
+@st.cache_data(max_entries=256, show_spinner=False)
+def get_legal_move_choices(fen: str) -> Tuple[Tuple[str, ...], Tuple[Dict[str, str], ...]]:
+    """Build the icon-formatted legal move list for a position once, not on every rerun."""
+    board = chess.Board(fen)
+    
+    # Convert legal moves to algebraic notation
+    move_options = []
+    move_details = []
+    
+    for move in board.legal_moves:
+        # Convert to algebraic notation
+        algebraic_move = board.san(move)
+        uci_move = move.uci()
+        
+        # Format with piece icons
+        formatted_move = convert_to_piece_icons(algebraic_move)
+        
+        move_options.append(f"{formatted_move}")
+        move_details.append({
+            'move': algebraic_move,
+            'uci': uci_move,
+            'formatted': formatted_move
+        })
+    
+    if not move_options:
+        return (), ()
+    
+    # Sort moves alphabetically for consistent display
+    sorted_moves = sorted(zip(move_options, move_details), key=lambda x: x[0])
+    move_options, move_details = zip(*sorted_moves)
+    return move_options, move_details
+
 def display_fallback_move_selection(position_data: Dict[str, Any]):
     """Fallback method using top moves if legal move generation fails."""
     st.warning("⚠️ Using fallback move selection method")
@@ -1784,21 +1785,11 @@ def get_user_training_settings():
 
 def convert_to_piece_icons(move_string: str) -> str:
     """Convert move notation to use piece icons instead of letters."""
-    piece_icons = {
-        'K': '♔', 'Q': '♕', 'R': '♖', 'B': '♗', 'N': '♘'
-    }
-    
     if not move_string:
         return move_string
     
-    # Handle different move formats
-    result = move_string
-    
     # Replace piece letters with icons (but not pawns)
-    for piece, icon in piece_icons.items():
-        result = result.replace(piece, icon)
-    
-    return result
+    return move_string.translate(PIECE_ICON_TABLE)
 
 
 # Add this function to training.py